@@ -3,16 +3,30 @@ Sample data generator for testing the Agentic RAG system.
 Creates synthetic documentation, code, and tickets for demonstration.
 """
 
-import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+import orjson
 from langchain.schema import Document
 
+from knoroute._clients import get_embeddings
+from knoroute.config import settings
 from knoroute.ingestion import (
     DocsIngestionPipeline,
     CodeIngestionPipeline,
     TicketsIngestionPipeline,
     MemoryWriter
 )
+from knoroute.vectorstores import (
+    DocsVectorStore,
+    CodeVectorStore,
+    TicketsVectorStore,
+    MemoryVectorStore
+)
+
+
+# Persistent worker pool for the independent, I/O-bound generation and
+# ingestion stages
+_INGEST_EXECUTOR = ThreadPoolExecutor(max_workers=3)
 
 
 def create_sample_docs():
@@ -21,7 +35,7 @@ def create_sample_docs():
     docs_dir.mkdir(parents=True, exist_ok=True)
     
     # Authentication documentation
-    auth_doc = """# Authentication
+    auth_doc = b"""# Authentication
 
 ## Overview
 
@@ -53,10 +67,10 @@ Our system uses JWT (JSON Web Tokens) for authentication with the following char
 - `POST /auth/refresh` - Refresh expired token
 """
     
-    (docs_dir / "authentication.md").write_text(auth_doc)
+    (docs_dir / "authentication.md").write_bytes(auth_doc)
     
     # Middleware documentation
-    middleware_doc = """# Middleware
+    middleware_doc = b"""# Middleware
 
 ## Rate Limiting
 
@@ -87,7 +101,7 @@ All errors follow this format:
 ```
 """
     
-    (docs_dir / "middleware.md").write_text(middleware_doc)
+    (docs_dir / "middleware.md").write_bytes(middleware_doc)
     
     print(f"✓ Created sample documentation in {docs_dir}")
 
@@ -98,7 +112,7 @@ def create_sample_code():
     code_dir.mkdir(parents=True, exist_ok=True)
     
     # Authentication service
-    auth_service = '''"""Authentication service implementation."""
+    auth_service = b'''"""Authentication service implementation."""
 
 import jwt
 from datetime import datetime, timedelta
@@ -166,10 +180,10 @@ def verify_token(token: str) -> dict:
         raise AuthenticationError("Invalid token")
 '''
     
-    (code_dir / "auth_service.py").write_text(auth_service)
+    (code_dir / "auth_service.py").write_bytes(auth_service)
     
     # Rate limiting middleware
-    rate_limit = '''"""Rate limiting middleware using Redis."""
+    rate_limit = b'''"""Rate limiting middleware using Redis."""
 
 import redis
 from datetime import datetime
@@ -221,7 +235,7 @@ def rate_limit_middleware():
     return None
 '''
     
-    (code_dir / "rate_limit.py").write_text(rate_limit)
+    (code_dir / "rate_limit.py").write_bytes(rate_limit)
     
     print(f"✓ Created sample code in {code_dir}")
 
@@ -273,8 +287,9 @@ def create_sample_tickets():
         }
     ]
     
-    with open(tickets_dir / "tickets.json", "w") as f:
-        json.dump(tickets, f, indent=2)
+    (tickets_dir / "tickets.json").write_bytes(
+        orjson.dumps(tickets, option=orjson.OPT_INDENT_2)
+    )
     
     print(f"✓ Created sample tickets in {tickets_dir}")
 
@@ -285,35 +300,47 @@ def ingest_all_sample_data():
     print("Ingesting Sample Data")
     print("="*60 + "\n")
     
-    # Ingest documentation
-    print("1. Ingesting documentation...")
-    docs_pipeline = DocsIngestionPipeline()
-    docs_pipeline.ingest_directory(
-        directory_path="./sample_data/docs",
-        glob_pattern="**/*.md",
-        doc_type="guide"
-    )
-    
-    # Ingest code
-    print("\n2. Ingesting code...")
-    code_pipeline = CodeIngestionPipeline()
-    code_pipeline.ingest_directory(
-        directory_path="./sample_data/code",
-        glob_pattern="**/*.py",
-        extract_functions=True
-    )
+    # One embeddings client shared by every store so workers reuse its
+    # HTTP connection pool instead of each opening their own
+    embeddings = get_embeddings()
+    
+    docs_pipeline = DocsIngestionPipeline(DocsVectorStore(embeddings=embeddings))
+    code_pipeline = CodeIngestionPipeline(CodeVectorStore(embeddings=embeddings))
+    tickets_pipeline = TicketsIngestionPipeline(TicketsVectorStore(embeddings=embeddings))
+    
+    # Docs, code and tickets are independent - ingest them concurrently
+    print("1-3. Ingesting documentation, code and tickets in parallel...")
+    futures = {
+        _INGEST_EXECUTOR.submit(
+            docs_pipeline.ingest_directory,
+            directory_path="./sample_data/docs",
+            glob_pattern="**/*.md",
+            doc_type="guide"
+        ): "documentation",
+        _INGEST_EXECUTOR.submit(
+            code_pipeline.ingest_directory,
+            directory_path="./sample_data/code",
+            glob_pattern="**/*.py",
+            extract_functions=True
+        ): "code",
+        _INGEST_EXECUTOR.submit(
+            tickets_pipeline.ingest_json,
+            file_path="./sample_data/tickets/tickets.json",
+            format_type="generic"
+        ): "tickets",
+    }
     
-    # Ingest tickets
-    print("\n3. Ingesting tickets...")
-    tickets_pipeline = TicketsIngestionPipeline()
-    tickets_pipeline.ingest_json(
-        file_path="./sample_data/tickets/tickets.json",
-        format_type="generic"
-    )
+    for future in as_completed(futures):
+        doc_ids = future.result()
+        print(f"   ✓ Finished {futures[future]} ({len(doc_ids)} chunks)")
     
     # Add some initial memory
     print("\n4. Adding initial memory...")
-    memory_writer = MemoryWriter()
+    # Built like the workflow's memory store, so the insights land in the
+    # collection it reads (the local-embeddings one if enabled)
+    memory_writer = MemoryWriter(MemoryVectorStore(
+        embeddings=None if settings.memory_local_embeddings else embeddings
+    ))
     
     insights = [
         {
@@ -346,10 +373,10 @@ def ingest_all_sample_data():
 if __name__ == "__main__":
     print("Creating sample data for Agentic RAG system...\n")
     
-    # Create sample data
-    create_sample_docs()
-    create_sample_code()
-    create_sample_tickets()
+    # Create sample data (each writes its own directory, so run them together)
+    creators = [create_sample_docs, create_sample_code, create_sample_tickets]
+    for future in [_INGEST_EXECUTOR.submit(create) for create in creators]:
+        future.result()
     
     print("\n" + "="*60)
     print("Sample data created successfully!")
@@ -3,7 +3,29 @@ Test workflow script to demonstrate the Agentic RAG system.
 Run this after ingesting sample data.
 """
 
+import asyncio
+import functools
+
 from knoroute.graph import AgenticRAGWorkflow
+from knoroute.agents import QueryUnderstandingAgent, RoutingAgent
+
+
+@functools.lru_cache(maxsize=1)
+def _get_workflow() -> AgenticRAGWorkflow:
+    """Build the workflow once per process and reuse it across test modes."""
+    return AgenticRAGWorkflow()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_understanding_agent() -> QueryUnderstandingAgent:
+    """Shared query understanding agent (one LLM client per process)."""
+    return QueryUnderstandingAgent()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_routing_agent() -> RoutingAgent:
+    """Shared routing agent (one LLM client per process)."""
+    return RoutingAgent()
 
 
 def print_separator(title=""):
@@ -36,7 +58,7 @@ def test_workflow():
     print_separator("Initializing Agentic RAG Workflow")
     
     # Initialize workflow
-    workflow = AgenticRAGWorkflow()
+    workflow = _get_workflow()
     
     print("\n✓ Workflow initialized successfully")
     
@@ -60,20 +82,22 @@ def test_workflow():
         }
     ]
     
-    for i, test_case in enumerate(test_queries, 1):
+    # Queries are independent, so dispatch them all at once
+    async def run_all():
+        return await asyncio.gather(
+            *(workflow.aquery(tc["query"], max_retries=3) for tc in test_queries),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run_all())
+    
+    for i, (test_case, result) in enumerate(zip(test_queries, results), 1):
         print_separator(f"Test {i}: {test_case['description']}")
         
-        query = test_case["query"]
-        
-        try:
-            # Execute query
-            answer = workflow.query(query, max_retries=3)
-            
-            # Print results
-            print_answer(query, answer)
-            
-        except Exception as e:
-            print(f"\n❌ Error processing query: {e}")
+        if isinstance(result, Exception):
+            print(f"\n❌ Error processing query: {result}")
+        else:
+            print_answer(test_case["query"], result)
     
     print_separator("Testing Complete")
     
@@ -90,14 +114,9 @@ def test_individual_components():
     
     print_separator("Testing Individual Components")
     
-    from knoroute.agents import (
-        QueryUnderstandingAgent,
-        RoutingAgent
-    )
-    
     # Test query understanding
     print("\n1. Testing Query Understanding Agent")
-    understanding_agent = QueryUnderstandingAgent()
+    understanding_agent = _get_understanding_agent()
     
     test_query = "Why did login fail yesterday?"
     understanding = understanding_agent.understand(test_query)
@@ -110,7 +129,7 @@ def test_individual_components():
     
     # Test routing
     print("\n2. Testing Routing Agent")
-    routing_agent = RoutingAgent()
+    routing_agent = _get_routing_agent()
     
     routing = routing_agent.route(test_query, understanding)
     
@@ -126,7 +145,7 @@ def interactive_mode():
     print_separator("Interactive Mode")
     print("\nType your queries (or 'quit' to exit)")
     
-    workflow = AgenticRAGWorkflow()
+    workflow = _get_workflow()
     
     while True:
         query = input("\n🔍 Query: ").strip()
@@ -147,7 +166,16 @@ def interactive_mode():
 
 
 if __name__ == "__main__":
-    import sys
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        description="Agentic Knowledge Routing System - Test Suite"
+    )
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+    subparsers.add_parser("auto", help="Run automated tests")
+    subparsers.add_parser("components", help="Test individual components")
+    subparsers.add_parser("interactive", help="Interactive mode")
+    args = parser.parse_args()
     
     print("""
 ╔══════════════════════════════════════════════════════════╗
@@ -155,23 +183,9 @@ if __name__ == "__main__":
 ╚══════════════════════════════════════════════════════════╝
 """)
     
-    print("Select test mode:")
-    print("  1. Run automated tests")
-    print("  2. Test individual components")
-    print("  3. Interactive mode")
-    print("  4. Exit")
-    
-    choice = input("\nChoice (1-4): ").strip()
-    
-    if choice == "1":
+    if args.mode == "auto":
         test_workflow()
-    elif choice == "2":
+    elif args.mode == "components":
         test_individual_components()
-    elif choice == "3":
+    elif args.mode == "interactive":
         interactive_mode()
-    elif choice == "4":
-        print("\nGoodbye!")
-        sys.exit(0)
-    else:
-        print("\nInvalid choice. Exiting.")
-        sys.exit(1)
@@ -0,0 +1,97 @@
+"""On-disk cache of LLM answers keyed by (query, evidence, model and prompt)."""
+
+import functools
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Type
+
+from pydantic import BaseModel
+
+from knoroute.config import settings
+
+
+class _AnswerCache:
+    """
+    Tiny SQLite key/value store; the connection is opened on first use.
+    
+    Holds at most ``max_entries`` rows: each write drops the oldest rows
+    beyond the limit (rowids grow with every insert or replace).
+    """
+    
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+        return self._conn
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO answers (key, value) VALUES (?, ?)",
+                (key, value)
+            )
+            conn.execute(
+                "DELETE FROM answers WHERE rowid <= (SELECT MAX(rowid) FROM answers) - ?",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+
+def cached_answer(model_cls: Type[BaseModel], path: Optional[str] = None):
+    """
+    Cache a ``(self, query, evidence_text) -> model_cls`` method on disk.
+    
+    Identical query/evidence pairs are answered from the cache without an
+    LLM roundtrip. Keys also include the instance's ``cache_namespace``
+    (its model and a fingerprint of its prompt), so switching models or
+    editing the prompt never serves answers produced by the old setup.
+    The oldest answers beyond ``settings.answer_cache_max_entries`` are
+    evicted.
+    
+    Args:
+        model_cls: Pydantic model returned by the wrapped method
+        path: SQLite file (defaults to settings.answer_cache_path)
+    """
+    def decorator(fn):
+        cache = _AnswerCache(
+            path or settings.answer_cache_path,
+            settings.answer_cache_max_entries
+        )
+        
+        @functools.wraps(fn)
+        def wrapper(self, query: str, evidence_text: str):
+            key = hashlib.blake2b(
+                "\x1f".join((query, evidence_text, self.cache_namespace)).encode("utf-8"),
+                digest_size=32
+            ).hexdigest()
+            
+            hit = cache.get(key)
+            if hit is not None:
+                return model_cls.model_validate_json(hit)
+            
+            result = fn(self, query, evidence_text)
+            cache.set(key, result.model_dump_json())
+            return result
+        
+        return wrapper
+    
+    return decorator
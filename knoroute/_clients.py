@@ -0,0 +1,233 @@
+"""Process-wide HTTP clients shared by all LLM instances."""
+
+import asyncio
+import sqlite3
+import threading
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Tuple
+
+import httpx
+from langchain_core.embeddings import Embeddings
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from knoroute.config import settings
+
+
+class _PerLoopAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient that sends each request through a pool owned by the running loop.
+    
+    Async connections are bound to the event loop that opened them, and
+    callers run several loops (``asyncio.run`` in scripts, uvicorn reloads),
+    so one shared pool would fail with "Event loop is closed". This client
+    only builds requests; ``send`` delegates to a pool created lazily for
+    the current loop and dropped once that loop is closed.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pool_kwargs = kwargs
+        self._pools: Dict[int, Tuple[weakref.ref, httpx.AsyncClient]] = {}
+        self._pools_lock = threading.Lock()
+    
+    def _pool(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._pools_lock:
+            entry = self._pools.get(id(loop))
+            if entry is None or entry[0]() is not loop:
+                # Forget pools whose loop is gone (their ids may be reused)
+                for key, (loop_ref, _) in list(self._pools.items()):
+                    dead = loop_ref()
+                    if dead is None or dead.is_closed():
+                        del self._pools[key]
+                entry = (weakref.ref(loop), httpx.AsyncClient(**self._pool_kwargs))
+                self._pools[id(loop)] = entry
+        return entry[1]
+    
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._pool().send(request, **kwargs)
+    
+    async def aclose(self):
+        """Close the pool of the running loop."""
+        with self._pools_lock:
+            entry = self._pools.pop(id(asyncio.get_running_loop()), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+
+# One connection pool per process (per event loop for async calls) so
+# repeated agent construction (and retries) reuse open TCP+TLS sessions
+# instead of reconnecting; HTTP/2 multiplexes concurrent requests (e.g.
+# parallel retrieval embeddings and LLM calls) over the same connection
+_shared_httpx_client = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+)
+_shared_async_httpx_client = _PerLoopAsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+)
+
+# Process-wide cap on in-flight LLM calls (one budget for the org rate limit
+# regardless of how many agents or workflow threads are running)
+llm_semaphore = threading.BoundedSemaphore(settings.llm_max_concurrency)
+
+
+@lru_cache(maxsize=None)
+def get_chat_llm(temperature: float = 0) -> ChatOpenAI:
+    """
+    Return the process-wide ChatOpenAI instance for ``temperature``.
+    
+    Instances are memoized, so every agent and store shares one client (and
+    one tiktoken encoder) on top of the shared connection pools.
+    
+    Args:
+        temperature: Sampling temperature
+        
+    Returns:
+        ChatOpenAI instance
+    """
+    return ChatOpenAI(
+        model=settings.llm_model,
+        temperature=temperature,
+        openai_api_key=settings.openai_api_key,
+        http_client=_shared_httpx_client,
+        http_async_client=_shared_async_httpx_client
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> Embeddings:
+    """
+    Return the process-wide embeddings client selected by ``settings.embedding_backend``.
+    
+    The client is memoized, so every store and agent shares one instance
+    (one model load for local backends).
+    
+    ``"openai"`` uses the OpenAI embeddings API. ``"huggingface-onnx"`` runs
+    ``settings.local_embedding_model`` locally through ONNX Runtime on CPU,
+    loading the int8-quantized export named by ``settings.onnx_model_file``
+    (requires ``sentence-transformers[onnx]``). Documents and queries must
+    be embedded by the same backend, so switching requires re-ingesting.
+    
+    Unless ``settings.embedding_cache_path`` is empty, the client is wrapped
+    in a ``CacheBackedEmbeddings`` whose on-disk store is namespaced by
+    model, so identical texts are only ever embedded once.
+    
+    Returns:
+        Embeddings instance
+    """
+    if settings.embedding_backend == "huggingface-onnx":
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        
+        embeddings = HuggingFaceEmbeddings(
+            model_name=settings.local_embedding_model,
+            model_kwargs={
+                "backend": "onnx",
+                "model_kwargs": {
+                    "file_name": settings.onnx_model_file,
+                    "provider": "CPUExecutionProvider"
+                }
+            },
+            encode_kwargs={"batch_size": 64}
+        )
+        model = f"{settings.local_embedding_model}:{settings.onnx_model_file}"
+    else:
+        embeddings = OpenAIEmbeddings(
+            model=settings.embedding_model,
+            openai_api_key=settings.openai_api_key,
+            http_client=_shared_httpx_client,
+            http_async_client=_shared_async_httpx_client
+        )
+        model = settings.embedding_model
+    
+    return _with_disk_cache(embeddings, model)
+
+
+@lru_cache(maxsize=1)
+def get_local_embeddings() -> Embeddings:
+    """
+    Return the process-wide local sentence-transformers embeddings client.
+    
+    Runs ``settings.local_embedding_model`` (384-D all-MiniLM-L6-v2 by
+    default) on CPU with normalized vectors; used by the memory store when
+    ``settings.memory_local_embeddings`` is set (requires
+    ``sentence-transformers``). With the ``"huggingface-onnx"`` backend the
+    shared client already runs that model, so it is returned instead.
+    
+    Returns:
+        Embeddings instance
+    """
+    if settings.embedding_backend == "huggingface-onnx":
+        return get_embeddings()
+    
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    
+    embeddings = HuggingFaceEmbeddings(
+        model_name=settings.local_embedding_model,
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"normalize_embeddings": True, "batch_size": 64}
+    )
+    return _with_disk_cache(embeddings, settings.local_embedding_model)
+
+
+def _with_disk_cache(embeddings: Embeddings, model: str) -> Embeddings:
+    """Wrap ``embeddings`` in the on-disk cache (namespaced by ``model``) if enabled."""
+    if not settings.embedding_cache_path:
+        return embeddings
+    
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import LocalFileStore
+    
+    return CacheBackedEmbeddings.from_bytes_store(
+        embeddings,
+        LocalFileStore(settings.embedding_cache_path),
+        namespace=model,
+        query_embedding_cache=True
+    )
+
+
+async def aclose_clients():
+    """Close the shared connection pools (call once, at process shutdown, on the serving loop)."""
+    _shared_httpx_client.close()
+    await _shared_async_httpx_client.aclose()
+
+
+@lru_cache(maxsize=1)
+def configure_llm_cache():
+    """
+    Install a persistent SQLite cache for every LangChain LLM call.
+    
+    Called by the workflow on construction (never at import time); later
+    calls are no-ops.
+    
+    All agents run at temperature 0, so identical rendered prompts give the
+    same response; repeated runs are answered from disk. LangChain keys
+    entries on the prompt and the serialized model parameters, so changing
+    the model invalidates them automatically. The oldest entries beyond
+    ``settings.llm_cache_max_entries`` are evicted at startup. An empty
+    ``settings.llm_cache_path`` disables the cache.
+    """
+    if not settings.llm_cache_path:
+        return
+    
+    from langchain_community.cache import SQLiteCache
+    from langchain_core.globals import set_llm_cache
+    
+    Path(settings.llm_cache_path).parent.mkdir(parents=True, exist_ok=True)
+    set_llm_cache(SQLiteCache(database_path=settings.llm_cache_path))
+    
+    # Bound the file: drop the oldest rows, then reclaim the space
+    with sqlite3.connect(settings.llm_cache_path) as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM full_llm_cache").fetchone()
+        excess = count - settings.llm_cache_max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM full_llm_cache WHERE rowid IN "
+                "(SELECT rowid FROM full_llm_cache ORDER BY rowid LIMIT ?)",
+                (excess,)
+            )
+            conn.commit()
+            conn.execute("VACUUM")
@@ -2,6 +2,7 @@
 
 from .query_understanding import QueryUnderstandingAgent, QueryUnderstanding
 from .routing_agent import RoutingAgent, RoutingDecision
+from .query_planner import QueryPlannerAgent, QueryPlan
 from .evaluator_agent import EvaluatorAgent, EvaluationResult
 from .answer_agent import AnswerAgent, GroundedAnswer, Citation
 from .retriever_tools import RetrieverTools
@@ -11,6 +12,8 @@ __all__ = [
     "QueryUnderstanding",
     "RoutingAgent",
     "RoutingDecision",
+    "QueryPlannerAgent",
+    "QueryPlan",
     "EvaluatorAgent",
     "EvaluationResult",
     "AnswerAgent",
@@ -0,0 +1,21 @@
+"""Prompt helpers shared by the agents."""
+
+
+def bake_format_instructions(system_prompt: str, format_instructions: str) -> str:
+    """
+    Inline parser format instructions into a system prompt template.
+    
+    The rendered system message is then a static, byte-identical prefix on
+    every call, which lets the provider's automatic prompt-prefix cache
+    reuse it. Braces in the instructions are escaped so the template still
+    only has its per-call variables.
+    
+    Args:
+        system_prompt: Template containing a ``{format_instructions}`` slot
+        format_instructions: Text from ``parser.get_format_instructions()``
+        
+    Returns:
+        System prompt template with the instructions filled in
+    """
+    escaped = format_instructions.replace("{", "{{").replace("}", "}}")
+    return system_prompt.replace("{format_instructions}", escaped)
@@ -1,13 +1,35 @@
 """Answer generation agent with strict grounding and citations."""
 
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict
 from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.documents import Document
+from langchain_core.outputs import Generation
 
-from knoroute.config import settings
+from knoroute._answer_cache import cached_answer
+from knoroute._clients import get_chat_llm, llm_semaphore
+from knoroute.agents._prompts import bake_format_instructions
+
+
+# (label, metadata key) pairs shown in the evidence header per source database
+_META_FMT = {
+    "code": (("File", "file_path"), ("Function", "function_name")),
+    "tickets": (("Ticket", "ticket_id"), ("Severity", "severity")),
+    "docs": (("Type", "doc_type"), ("Section", "section")),
+}
+# Metadata keys of which at least one must be set for the header to appear
+_META_GATE = {
+    "code": ("file_path", "function_name"),
+    "tickets": ("ticket_id",),
+    "docs": ("doc_type",),
+}
 
 
 class Citation(BaseModel):
@@ -38,6 +60,41 @@ class GroundedAnswer(BaseModel):
     )
 
 
+_FENCE_RE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+
+class _FastPydanticOutputParser(PydanticOutputParser):
+    """
+    PydanticOutputParser that validates the reply in one step.
+    
+    Well-formed replies (optionally fenced) go straight through pydantic's
+    ``model_validate_json`` instead of json -> dict -> model; anything else
+    falls back to the regular, more lenient parsing path.
+    """
+    
+    def parse_result(self, result: List[Generation], *, partial: bool = False):
+        if not partial:
+            text = result[0].text.strip()
+            match = _FENCE_RE.match(text)
+            try:
+                return self.pydantic_object.model_validate_json(
+                    match.group(1) if match else text
+                )
+            except ValidationError:
+                pass
+        
+        return super().parse_result(result, partial=partial)
+    
+    def parse(self, text: str):
+        return self.parse_result([Generation(text=text)])
+
+
+# Pure function of the (immutable) schema - computed once at import
+_FORMAT_INSTRUCTIONS = PydanticOutputParser(
+    pydantic_object=GroundedAnswer
+).get_format_instructions()
+
+
 class AnswerAgent:
     """
     Agent that generates grounded answers with citations.
@@ -49,18 +106,14 @@ class AnswerAgent:
         Initialize the answer agent.
         
         Args:
-            llm: Language model instance (creates new if None)
+            llm: Language model instance (uses the shared connection pool if None)
         """
-        self.llm = llm or ChatOpenAI(
-            model=settings.llm_model,
-            temperature=0,
-            openai_api_key=settings.openai_api_key
-        )
+        self.llm = llm or get_chat_llm(temperature=0)
         
-        self.parser = PydanticOutputParser(pydantic_object=GroundedAnswer)
+        self.parser = _FastPydanticOutputParser(pydantic_object=GroundedAnswer)
         
         self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert technical writer for an engineering knowledge system.
+            ("system", bake_format_instructions("""You are an expert technical writer for an engineering knowledge system.
 
 CRITICAL RULES:
 1. **Only use information from the provided evidence** - do not add external knowledge
@@ -85,14 +138,35 @@ LEARNED INSIGHTS:
 - Should be a general principle or pattern
 - Only if the answer reveals something valuable
 
-{format_instructions}"""),
-            ("user", """Query: {query}
-
-Retrieved Evidence:
+{format_instructions}""", _FORMAT_INSTRUCTIONS)),
+            ("user", """Retrieved Evidence:
 {evidence}
 
+Query: {query}
+
 Generate a grounded answer using ONLY the evidence provided.""")
         ])
+        
+        # The format instructions are baked into the system message, which
+        # is therefore byte-identical on every call; the chain is fixed too.
+        # Evidence precedes the query so that queries answered from the same
+        # chunks share a long prompt prefix the provider can serve from its
+        # prompt (KV) cache instead of prefilling it again
+        # Answers are cached by @cached_answer, so the chain's LLM skips the
+        # global LangChain cache rather than storing every answer twice
+        self._chain = self.prompt | self.llm.model_copy(update={"cache": False}) | self.parser
+        
+        # Answer cache namespace: the model actually used and the prompt
+        # text (format instructions included)
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "")
+        templates = "\x1f".join(message.prompt.template for message in self.prompt.messages)
+        self.cache_namespace = f"{model}:{hashlib.sha256(templates.encode('utf-8')).hexdigest()[:16]}"
+        
+        # Formatted evidence for recent document sets; one agent serves
+        # concurrent queries, so every access holds the lock
+        self._evidence_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._evidence_cache_size = 32
+        self._evidence_lock = threading.Lock()
     
     def generate(
         self,
@@ -109,20 +183,35 @@ Generate a grounded answer using ONLY the evidence provided.""")
         Returns:
             GroundedAnswer with citations and optional insight
         """
-        # Format evidence with IDs
-        evidence_text = self._format_evidence_with_ids(retrieved_docs)
-        
-        # Create the chain
-        chain = self.prompt | self.llm | self.parser
+        # Format evidence with IDs (memoized per document set)
+        cache_key = tuple(
+            doc.metadata.get("chunk_id")
+            or (doc.metadata.get("source_db"), doc.page_content)
+            for doc in retrieved_docs
+        )
+        with self._evidence_lock:
+            evidence_text = self._evidence_cache.get(cache_key)
+            if evidence_text is not None:
+                self._evidence_cache.move_to_end(cache_key)
         
-        # Execute
-        result = chain.invoke({
-            "query": query,
-            "evidence": evidence_text,
-            "format_instructions": self.parser.get_format_instructions()
-        })
+        if evidence_text is None:
+            evidence_text = self._format_evidence_with_ids(retrieved_docs)
+            with self._evidence_lock:
+                self._evidence_cache[cache_key] = evidence_text
+                self._evidence_cache.move_to_end(cache_key)
+                while len(self._evidence_cache) > self._evidence_cache_size:
+                    self._evidence_cache.popitem(last=False)
         
-        return result
+        return self._answer(query, evidence_text)
+    
+    @cached_answer(GroundedAnswer)
+    def _answer(self, query: str, evidence_text: str) -> GroundedAnswer:
+        """Run the LLM chain (cached on disk per query/evidence/cache_namespace)."""
+        with llm_semaphore:
+            return self._chain.invoke({
+                "query": query,
+                "evidence": evidence_text
+            })
     
     def _format_evidence_with_ids(self, documents: List[Document]) -> str:
         """
@@ -137,41 +226,44 @@ Generate a grounded answer using ONLY the evidence provided.""")
         if not documents:
             return "No evidence available."
         
-        formatted_parts = []
+        # Pull each field into its own list in one pass, then format by zipping
+        metadatas = [doc.metadata for doc in documents]
+        source_dbs = [metadata.get("source_db", "unknown") for metadata in metadatas]
+        metadata_lines = [self._format_metadata(metadata) for metadata in metadatas]
+        contents = [doc.page_content for doc in documents]
         
-        for i, doc in enumerate(documents, 1):
-            source_db = doc.metadata.get("source_db", "unknown")
-            
-            # Include relevant metadata
-            metadata_str = ""
-            if source_db == "code":
-                file_path = doc.metadata.get("file_path", "")
-                function = doc.metadata.get("function_name", "")
-                if file_path or function:
-                    metadata_str = f"\nFile: {file_path}, Function: {function}"
-            elif source_db == "tickets":
-                ticket_id = doc.metadata.get("ticket_id", "")
-                severity = doc.metadata.get("severity", "")
-                if ticket_id:
-                    metadata_str = f"\nTicket: {ticket_id}, Severity: {severity}"
-            elif source_db == "docs":
-                doc_type = doc.metadata.get("doc_type", "")
-                section = doc.metadata.get("section", "")
-                if doc_type:
-                    metadata_str = f"\nType: {doc_type}, Section: {section}"
-            
-            formatted_parts.append(
-                f"[{i}] Source: {source_db}{metadata_str}\n{doc.page_content}\n"
+        return "\n".join([
+            f"[{i}] Source: {source_db}{metadata_line}\n{content}\n"
+            for i, (source_db, metadata_line, content) in enumerate(
+                zip(source_dbs, metadata_lines, contents), 1
             )
+        ])
+    
+    @staticmethod
+    def _format_metadata(metadata: Dict) -> str:
+        """Render the citation-relevant metadata line for one document."""
+        source_db = metadata.get("source_db")
+        fields = _META_FMT.get(source_db)
+        if not fields or not any(metadata.get(key) for key in _META_GATE[source_db]):
+            return ""
         
-        return "\n".join(formatted_parts)
+        values = [metadata.get(key, "") for _, key in fields]
+        return "\n" + ", ".join(
+            f"{label}: {value}" for (label, _), value in zip(fields, values)
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_answer_agent() -> AnswerAgent:
+    """Lazily built process-wide AnswerAgent (LLM on the shared HTTP pool)."""
+    return AnswerAgent()
 
 
 # Example usage
 if __name__ == "__main__":
     from langchain_core.documents import Document
     
-    agent = AnswerAgent()
+    agent = _get_answer_agent()
     
     # Test query
     query = "How does authentication work?"
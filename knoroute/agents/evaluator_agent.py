@@ -1,17 +1,93 @@
 """Evidence evaluator agent."""
 
+import functools
+import hashlib
+import json
+import re
 from typing import List, Optional
-from pydantic import BaseModel, Field
+
+import numpy as np
+import tiktoken
+from pydantic import BaseModel, Field, ValidationError
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.documents import Document
+from langchain_core.utils.json import parse_partial_json
 
 from knoroute.config import settings
+from knoroute.semantic_cache import SemanticCache
+from knoroute._clients import get_embeddings, get_chat_llm, llm_semaphore
+
+
+# Total evidence tokens shared across all documents sent to the evaluator
+EVIDENCE_TOKEN_BUDGET = 3000
+
+# A streamed "sufficient" verdict at or above this confidence ends generation
+EARLY_STOP_CONFIDENCE = 0.85
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding() -> "tiktoken.Encoding":
+    """Tokenizer for the configured model (cl100k_base if unknown)."""
+    try:
+        return tiktoken.encoding_for_model(settings.llm_model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+# Keyword coverage at or above this lets a simple query skip the LLM call
+# (only with settings.evaluator_fast_path)
+FAST_PATH_COVERAGE = 0.85
+
+_WORD_RE = re.compile(r"[a-z0-9_]{3,}")
+_STOPWORDS = frozenset({
+    "the", "and", "for", "are", "does", "how", "what", "why", "when", "where",
+    "which", "who", "our", "your", "with", "this", "that", "from", "into",
+    "work", "works", "use", "used", "can", "should", "would", "could", "there",
+    "system", "explain", "about", "some", "any", "all", "has", "have", "did",
+})
+
+
+def _keyword_coverage(query: str, evidence_text: str) -> float:
+    """Fraction of the query's content words that appear in the evidence."""
+    keywords = set(_WORD_RE.findall(query.lower())) - _STOPWORDS
+    if not keywords:
+        return 0.0
+    evidence_words = set(_WORD_RE.findall(evidence_text.lower()))
+    return len(keywords & evidence_words) / len(keywords)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cross_encoder(model_name: str):
+    """Load a local cross-encoder reranker once (needs sentence-transformers)."""
+    from sentence_transformers import CrossEncoder
+    
+    return CrossEncoder(model_name)
+
+
+def _simhash64(text: str) -> int:
+    """64-bit SimHash over word 3-shingles (near-duplicates differ in few bits)."""
+    words = text.lower().split()
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(len(words) - 2, 1))]
+    
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
 
 
 class EvaluationResult(BaseModel):
-    """Structured output for evidence evaluation."""
+    """
+    Structured output for evidence evaluation.
+    
+    Field order is the JSON emission order: is_sufficient and confidence
+    stream first so a confident verdict can end generation early.
+    """
     
     is_sufficient: bool = Field(
         description="Whether the retrieved evidence is sufficient to answer the query confidently"
@@ -37,20 +113,29 @@ class EvaluatorAgent:
     Uses chain-of-thought reasoning to assess completeness.
     """
     
-    def __init__(self, llm: Optional[ChatOpenAI] = None):
+    def __init__(
+        self,
+        llm: Optional[ChatOpenAI] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
         """
         Initialize the evaluator agent.
         
         Args:
-            llm: Language model instance (creates new if None)
+            llm: Language model instance (uses the shared connection pools if None)
+            semantic_cache: Cache for paraphrased queries over the same evidence
+                (creates new if None)
         """
-        self.llm = llm or ChatOpenAI(
-            model=settings.llm_model,
-            temperature=0,
-            openai_api_key=settings.openai_api_key
-        )
+        self.llm = llm or get_chat_llm(temperature=0)
         
-        self.parser = PydanticOutputParser(pydantic_object=EvaluationResult)
+        self.semantic_cache = semantic_cache or SemanticCache(get_embeddings())
+        
+        # Native tool-call structured output, streamed so generation can
+        # stop once the verdict is known
+        self.tool_llm = self.llm.bind_tools(
+            [EvaluationResult],
+            tool_choice="EvaluationResult"
+        )
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an evidence evaluator for an engineering knowledge system.
@@ -78,9 +163,7 @@ IF INSUFFICIENT:
   * tickets - for historical failures, bugs
   * memory - for learned patterns, insights
 
-Think step-by-step about what the query needs and what the evidence provides.
-
-{format_instructions}"""),
+Think step-by-step about what the query needs and what the evidence provides."""),
             ("user", """Query: {query}
 
 Retrieved Evidence:
@@ -90,40 +173,153 @@ Sources queried: {sources}
 
 Evaluate if this evidence is sufficient to answer the query.""")
         ])
+        
+        # The chain is fixed per instance
+        self._chain = self.prompt | self.tool_llm
     
     def evaluate(
         self,
         query: str,
         retrieved_docs: List[Document],
-        sources_queried: List[str]
+        sources_queried: List[str],
+        complexity: Optional[str] = None
     ) -> EvaluationResult:
         """
         Evaluate whether retrieved evidence is sufficient.
         
+        With ``settings.evaluator_fast_path``, simple queries whose content
+        words are all but fully covered by the evidence are judged locally,
+        without an LLM call. Keyword overlap says nothing about relevance, so
+        this is off by default.
+        
         Args:
             query: User's original query
             retrieved_docs: List of retrieved documents
             sources_queried: Which databases were queried
+            complexity: Query complexity from QueryUnderstanding (the fast
+                path only applies to "simple")
             
         Returns:
             EvaluationResult with sufficiency assessment
         """
-        # Format evidence for evaluation
+        # Keep only the most relevant evidence, then format it
+        retrieved_docs = self._rerank(query, retrieved_docs)
         evidence_text = self._format_evidence(retrieved_docs)
+        sources = ", ".join(sources_queried)
+        
+        # Cheap coverage check for simple lookups (opt-in)
+        if settings.evaluator_fast_path and complexity == "simple" and retrieved_docs:
+            coverage = _keyword_coverage(query, evidence_text)
+            if coverage >= FAST_PATH_COVERAGE:
+                return EvaluationResult(is_sufficient=True, confidence=coverage)
         
-        # Create the chain
-        chain = self.prompt | self.llm | self.parser
+        # Paraphrases of an already-evaluated query over the same evidence
+        evidence_hash = hashlib.sha256(
+            f"{sources}\x1f{evidence_text}".encode("utf-8")
+        ).hexdigest()
+        cached = self.semantic_cache.lookup(query, evidence_hash)
+        if cached is not None:
+            return cached
         
         # Execute
-        result = chain.invoke({
+        result = self._stream_evaluation({
             "query": query,
             "evidence": evidence_text,
-            "sources": ", ".join(sources_queried),
-            "format_instructions": self.parser.get_format_instructions()
+            "sources": sources
         })
+        if result is None:
+            # No usable verdict: treat the evidence as insufficient (so a
+            # retry can follow) and don't cache the guess
+            return EvaluationResult(is_sufficient=False, confidence=0.0)
         
+        self.semantic_cache.add(query, evidence_hash, result)
         return result
     
+    def _rerank(self, query: str, documents: List[Document]) -> List[Document]:
+        """
+        Keep the ``settings.evaluator_top_n`` documents most relevant to the query.
+        
+        Uses the cross-encoder named by ``settings.reranker_model`` when set,
+        otherwise cosine similarity between query and document embeddings.
+        Lists already within the limit are returned unchanged.
+        
+        Args:
+            query: User's original query
+            documents: Retrieved documents
+            
+        Returns:
+            Documents ordered by relevance, trimmed to the limit
+        """
+        top_n = settings.evaluator_top_n
+        if len(documents) <= top_n:
+            return documents
+        
+        if settings.reranker_model:
+            reranker = _get_cross_encoder(settings.reranker_model)
+            scores = reranker.predict([(query, doc.page_content) for doc in documents])
+        else:
+            embeddings = self.semantic_cache.embeddings
+            query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+            doc_vectors = np.asarray(
+                embeddings.embed_documents([doc.page_content for doc in documents]),
+                dtype=np.float32
+            )
+            scores = (doc_vectors @ query_vector) / (
+                np.linalg.norm(doc_vectors, axis=1) * np.linalg.norm(query_vector) + 1e-12
+            )
+        
+        order = np.argsort(-np.asarray(scores), kind="stable")[:top_n]
+        return [documents[i] for i in order]
+    
+    def _stream_evaluation(self, inputs: dict) -> Optional[EvaluationResult]:
+        """
+        Stream the tool-call arguments and stop early on a confident verdict.
+        
+        Once the partial JSON shows ``is_sufficient=true`` with confidence at
+        or above EARLY_STOP_CONFIDENCE, and a later field has started (so the
+        confidence number is complete), the stream is closed and the
+        remaining (usually empty) lists are not generated. An empty or
+        truncated tool call is retried once without streaming.
+        
+        Args:
+            inputs: Prompt variables
+            
+        Returns:
+            EvaluationResult, or None if no valid verdict could be parsed
+        """
+        args = ""
+        
+        with llm_semaphore:
+            for chunk in self._chain.stream(inputs):
+                for tool_chunk in chunk.tool_call_chunks:
+                    args += tool_chunk.get("args") or ""
+                
+                partial = parse_partial_json(args) if args else None
+                if (
+                    isinstance(partial, dict)
+                    and partial.get("is_sufficient") is True
+                    and isinstance(partial.get("confidence"), (int, float))
+                    and partial["confidence"] >= EARLY_STOP_CONFIDENCE
+                    and ("missing_aspects" in partial or "suggested_dbs" in partial)
+                ):
+                    # Leaving the loop closes the stream and stops generation
+                    return EvaluationResult(
+                        is_sufficient=True,
+                        confidence=partial["confidence"]
+                    )
+        
+        try:
+            return EvaluationResult.model_validate(json.loads(args))
+        except (json.JSONDecodeError, ValidationError):
+            pass
+        
+        with llm_semaphore:
+            message = self._chain.invoke(inputs)
+        try:
+            return EvaluationResult.model_validate(message.tool_calls[0]["args"])
+        except (IndexError, ValidationError):
+            return None
+    
     def _format_evidence(self, documents: List[Document]) -> str:
         """
         Format retrieved documents for evaluation.
@@ -137,14 +333,37 @@ Evaluate if this evidence is sufficient to answer the query.""")
         if not documents:
             return "No evidence retrieved."
         
+        kept = []
+        seen = set()
+        kept_simhashes = []
+        
+        for doc in documents:
+            # Skip exact duplicates, then near-duplicates (Hamming <= 3)
+            key = hashlib.blake2b(doc.page_content[:200].encode("utf-8"), digest_size=8).digest()
+            if key in seen:
+                continue
+            simhash = _simhash64(doc.page_content[:300])
+            if any(bin(simhash ^ other).count("1") <= 3 for other in kept_simhashes):
+                continue
+            seen.add(key)
+            kept_simhashes.append(simhash)
+            kept.append(doc)
+        
+        # Split a fixed token budget across the kept documents and cut each
+        # on a token boundary: few documents get more context, many get less
+        encoding = _get_encoding()
+        budget_per_doc = EVIDENCE_TOKEN_BUDGET // len(kept)
         formatted_parts = []
         
-        for i, doc in enumerate(documents, 1):
+        for i, doc in enumerate(kept, 1):
             source_db = doc.metadata.get("source_db", "unknown")
-            content = doc.page_content[:300]  # Truncate for context window
+            tokens = encoding.encode(doc.page_content)
+            content = encoding.decode(tokens[:budget_per_doc])
+            if len(tokens) > budget_per_doc:
+                content += "..."
             
             formatted_parts.append(
-                f"[{i}] Source: {source_db}\n{content}...\n"
+                f"[{i}] Source: {source_db}\n{content}\n"
             )
         
         return "\n".join(formatted_parts)
@@ -0,0 +1,101 @@
+"""Fused query understanding + routing agent (one LLM call per query)."""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import ChatPromptTemplate
+
+from knoroute._clients import get_chat_llm, llm_semaphore
+from knoroute.agents.query_understanding import (
+    QueryUnderstanding,
+    UNDERSTANDING_SYSTEM_PROMPT,
+    _QueryMemo
+)
+from knoroute.agents.routing_agent import RoutingDecision, ROUTING_SYSTEM_PROMPT
+
+
+class QueryPlan(BaseModel):
+    """Structured output combining query understanding and routing."""
+    
+    understanding: QueryUnderstanding = Field(
+        description="Classification of the user's query"
+    )
+    routing: RoutingDecision = Field(
+        description="Which databases to query, based on the understanding"
+    )
+
+
+class QueryPlannerAgent:
+    """
+    Agent that understands and routes a query in a single LLM call.
+    
+    The router's first-attempt input is derivable from the query alone, so
+    both decisions are produced together. Retries (which depend on the
+    evaluator's feedback) still go through RoutingAgent.
+    """
+    
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
+        """
+        Initialize the query planner agent.
+        
+        Args:
+            llm: Language model instance (uses the shared connection pools if None)
+        """
+        self.llm = llm or get_chat_llm(temperature=0)
+        
+        self.structured_llm = self.llm.with_structured_output(
+            QueryPlan,
+            method="function_calling"
+        )
+        
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", f"""You plan retrieval for an engineering knowledge system in two steps.
+
+STEP 1 - UNDERSTANDING
+
+{UNDERSTANDING_SYSTEM_PROMPT}
+
+STEP 2 - ROUTING
+
+{ROUTING_SYSTEM_PROMPT}
+
+Return the understanding from step 1 and the routing decision from step 2."""),
+            ("user", "{query}")
+        ])
+        
+        # The chain is fixed per instance
+        self._chain = self.prompt | self.structured_llm
+        
+        # Repeated queries (the workflow's first step) skip the LLM call;
+        # cached per instance, i.e. per model
+        self._memo = _QueryMemo()
+    
+    def plan(self, query: str) -> QueryPlan:
+        """
+        Understand a query and decide where to retrieve from.
+        
+        Args:
+            query: User's query string
+            
+        Returns:
+            QueryPlan with understanding and routing decision
+        """
+        return self._memo.get_or_compute(query, self._invoke)
+    
+    def _invoke(self, query: str) -> QueryPlan:
+        """Run the planning chain."""
+        with llm_semaphore:
+            return self._chain.invoke({"query": query})
+
+
+# Example usage
+if __name__ == "__main__":
+    agent = QueryPlannerAgent()
+    
+    query = "Why did login fail yesterday?"
+    plan = agent.plan(query)
+    
+    print(f"Query: {query}")
+    print(f"Intent: {plan.understanding.intent} | Topic: {plan.understanding.topic}")
+    print(f"Selected DBs: {plan.routing.selected_dbs}")
+    print(f"Reasoning: {plan.routing.reasoning}")
@@ -1,54 +1,63 @@
 """Query understanding agent."""
 
-from typing import Literal, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, Literal, Optional, TypeVar
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
 
-from knoroute.config import settings
+from knoroute._clients import get_chat_llm, llm_semaphore
 
 
-class QueryUnderstanding(BaseModel):
-    """Structured output for query understanding."""
-    
-    intent: Literal["debugging", "explanation", "comparison", "how_to"] = Field(
-        description="The primary intent of the user's query"
-    )
-    topic: str = Field(
-        description="The main topic or component being asked about (e.g., 'authentication', 'middleware', 'database')"
-    )
-    needs_memory: bool = Field(
-        description="Whether this query would benefit from learned/historical knowledge"
-    )
-    complexity: Literal["simple", "moderate", "complex"] = Field(
-        description="Estimated complexity of the query"
-    )
+_ResultT = TypeVar("_ResultT", bound=BaseModel)
 
 
-class QueryUnderstandingAgent:
+class _QueryMemo:
     """
-    Agent that analyzes user queries to understand intent and extract metadata.
-    Uses few-shot prompting for accurate intent classification.
+    Thread-safe LRU of agent results keyed by the normalized query.
+    
+    Only the key is normalized (whitespace collapsed, lowercased), so
+    verbatim repeats and trivial respellings skip the LLM call while the
+    chain always sees the query as written. Callers get copies.
     """
     
-    def __init__(self, llm: Optional[ChatOpenAI] = None):
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, BaseModel]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, query: str, compute: Callable[[str], _ResultT]) -> _ResultT:
         """
-        Initialize the query understanding agent.
+        Return the cached result for ``query``, running ``compute(query)`` on a miss.
         
         Args:
-            llm: Language model instance (creates new if None)
+            query: Query as written by the user
+            compute: Function producing the result from the original query
+            
+        Returns:
+            A copy of the (possibly cached) result
         """
-        self.llm = llm or ChatOpenAI(
-            model=settings.llm_model,
-            temperature=0,
-            openai_api_key=settings.openai_api_key
-        )
+        key = " ".join(query.split()).lower()
         
-        self.parser = PydanticOutputParser(pydantic_object=QueryUnderstanding)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
         
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert at understanding engineering queries.
+        if result is None:
+            result = compute(query)
+            with self._lock:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        
+        return result.model_copy(deep=True)
+
+
+# Static system prompt (shared with the fused QueryPlannerAgent)
+UNDERSTANDING_SYSTEM_PROMPT = """You are an expert at understanding engineering queries.
 Analyze the user's query and classify it according to these categories:
 
 INTENT:
@@ -93,11 +102,59 @@ Query: "How to add a new middleware?"
 Intent: how_to
 Topic: middleware
 Needs Memory: false
-Complexity: simple
+Complexity: simple"""
+
+
+class QueryUnderstanding(BaseModel):
+    """Structured output for query understanding."""
+    
+    intent: Literal["debugging", "explanation", "comparison", "how_to"] = Field(
+        description="The primary intent of the user's query"
+    )
+    topic: str = Field(
+        description="The main topic or component being asked about (e.g., 'authentication', 'middleware', 'database')"
+    )
+    needs_memory: bool = Field(
+        description="Whether this query would benefit from learned/historical knowledge"
+    )
+    complexity: Literal["simple", "moderate", "complex"] = Field(
+        description="Estimated complexity of the query"
+    )
+
 
-{format_instructions}"""),
+class QueryUnderstandingAgent:
+    """
+    Agent that analyzes user queries to understand intent and extract metadata.
+    Uses few-shot prompting for accurate intent classification.
+    """
+    
+    def __init__(self, llm: Optional[ChatOpenAI] = None):
+        """
+        Initialize the query understanding agent.
+        
+        Args:
+            llm: Language model instance (uses the shared connection pools if None)
+        """
+        self.llm = llm or get_chat_llm(temperature=0)
+        
+        # Native tool-call structured output: no schema text in the prompt
+        # and no free-text JSON parsing
+        self.structured_llm = self.llm.with_structured_output(
+            QueryUnderstanding,
+            method="function_calling"
+        )
+        
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", UNDERSTANDING_SYSTEM_PROMPT),
             ("user", "{query}")
         ])
+        
+        # The chain is fixed per instance
+        self._chain = self.prompt | self.structured_llm
+        
+        # Verbatim repeats (retries, eval harnesses) skip the LLM call;
+        # cached per instance, i.e. per model
+        self._memo = _QueryMemo()
     
     def understand(self, query: str) -> QueryUnderstanding:
         """
@@ -109,16 +166,15 @@ Complexity: simple
         Returns:
             QueryUnderstanding object with structured metadata
         """
-        # Create the chain
-        chain = self.prompt | self.llm | self.parser
-        
+        return self._memo.get_or_compute(query, self._invoke)
+    
+    def _invoke(self, query: str) -> QueryUnderstanding:
+        """Run the understanding chain."""
         # Execute
-        result = chain.invoke({
-            "query": query,
-            "format_instructions": self.parser.get_format_instructions()
-        })
-        
-        return result
+        with llm_semaphore:
+            return self._chain.invoke({
+                "query": query
+            })
 
 
 # Example usage
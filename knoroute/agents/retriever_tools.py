@@ -1,6 +1,9 @@
 """Retriever tools for LangGraph integration."""
 
-from typing import List, Dict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional
 from langchain_core.documents import Document
 from langchain_core.tools import Tool
 
@@ -12,6 +15,82 @@ from knoroute.vectorstores import (
 )
 
 
+# Fans a multi-database retrieval out so stores are searched concurrently
+_RETRIEVAL_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="knoroute-retrieval")
+
+
+class _SearchBatcher:
+    """
+    Coalesces concurrent searches against one store into a single query.
+    
+    A search arriving while the store is idle is dispatched immediately.
+    Searches arriving while a query is in flight queue up and are answered
+    together (up to ``max_batch_size`` at a time) by one embeddings call and
+    one Chroma query as soon as it returns; each caller then receives its own
+    slice of the results. Callers that already hold the query vector skip the
+    embedding step.
+    """
+    
+    def __init__(self, store, max_batch_size: int = 16):
+        self.store = store
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._lock = threading.Lock()
+        self._busy = False
+    
+    def search(
+        self,
+        query: str,
+        k: int,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Document]:
+        """Queue a search and block until its batch has been answered."""
+        future: Future = Future()
+        
+        with self._lock:
+            self._pending.append((query, query_vector, k, future))
+            leader = not self._busy
+            self._busy = True
+        
+        # The first caller drains the queue; the others just wait
+        if leader:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.max_batch_size]
+                    del self._pending[:self.max_batch_size]
+                    if not batch:
+                        self._busy = False
+                        break
+                self._dispatch(batch)
+        
+        return future.result()
+    
+    def _dispatch(self, batch):
+        # One Chroma query per distinct k
+        by_k: Dict[int, list] = {}
+        for item in batch:
+            by_k.setdefault(item[2], []).append(item)
+        
+        for k, items in by_k.items():
+            try:
+                vectors = [vector for _, vector, _, _ in items]
+                missing = [i for i, vector in enumerate(vectors) if vector is None]
+                if missing:
+                    embedded = self.store.embeddings.embed_documents(
+                        [items[i][0] for i in missing]
+                    )
+                    for i, vector in zip(missing, embedded):
+                        vectors[i] = vector
+                results = self.store.similarity_search_by_vectors(vectors, k=k)
+            except BaseException as e:
+                for _, _, _, future in items:
+                    future.set_exception(e)
+                continue
+            
+            for (_, _, _, future), docs in zip(items, results):
+                future.set_result(docs)
+
+
 class RetrieverTools:
     """
     Collection of retriever tools for each vector database.
@@ -23,7 +102,8 @@ class RetrieverTools:
         docs_store: DocsVectorStore,
         code_store: CodeVectorStore,
         tickets_store: TicketsVectorStore,
-        memory_store: MemoryVectorStore
+        memory_store: MemoryVectorStore,
+        max_batch_size: int = 16
     ):
         """
         Initialize retriever tools.
@@ -33,118 +113,179 @@ class RetrieverTools:
             code_store: Code vector store
             tickets_store: Tickets vector store
             memory_store: Memory vector store
+            max_batch_size: Concurrent searches coalesced into one store query
         """
         self.docs_store = docs_store
         self.code_store = code_store
         self.tickets_store = tickets_store
         self.memory_store = memory_store
+        
+        # Query embedder shared with every store that uses the same client
+        self.embedder = docs_store.embeddings
+        
+        # Retries and repeated queries reuse the vector instead of re-embedding
+        self._embed_query_cached = lru_cache(maxsize=1024)(self._embed_query)
+        
+        self._stores = {
+            "docs": docs_store,
+            "code": code_store,
+            "tickets": tickets_store,
+            "memory": memory_store,
+        }
+        
+        # Concurrent workflow runs share one batched query per store
+        self._batchers = {
+            db: _SearchBatcher(store, max_batch_size)
+            for db, store in self._stores.items()
+        }
+        
+        # Name -> retriever dispatch table
+        self._retrievers = {
+            "docs": self.retrieve_from_docs,
+            "code": self.retrieve_from_code,
+            "tickets": self.retrieve_from_tickets,
+            "memory": self.retrieve_from_memory,
+        }
     
-    def retrieve_from_docs(self, query: str, k: int = 5) -> List[Document]:
+    def retrieve_from_docs(
+        self,
+        query: str,
+        k: int = 5,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Document]:
         """
         Retrieve from documentation database.
         
         Args:
             query: Search query
             k: Number of results
+            query_vector: Precomputed query embedding (embedded here if None)
             
         Returns:
             List of documents with source_db metadata
         """
-        docs = self.docs_store.similarity_search(query, k=k)
-        
-        # Add source_db metadata
-        for doc in docs:
-            doc.metadata["source_db"] = "docs"
-        
-        return docs
+        # Results come back stamped with source_db by the store
+        return self._batchers["docs"].search(query, k, query_vector)
     
-    def retrieve_from_code(self, query: str, k: int = 5) -> List[Document]:
+    def retrieve_from_code(
+        self,
+        query: str,
+        k: int = 5,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Document]:
         """
         Retrieve from code database.
         
         Args:
             query: Search query
             k: Number of results
+            query_vector: Precomputed query embedding (embedded here if None)
             
         Returns:
             List of documents with source_db metadata
         """
-        docs = self.code_store.similarity_search(query, k=k)
-        
-        # Add source_db metadata
-        for doc in docs:
-            doc.metadata["source_db"] = "code"
-        
-        return docs
+        # Results come back stamped with source_db by the store
+        return self._batchers["code"].search(query, k, query_vector)
     
-    def retrieve_from_tickets(self, query: str, k: int = 5) -> List[Document]:
+    def retrieve_from_tickets(
+        self,
+        query: str,
+        k: int = 5,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Document]:
         """
         Retrieve from tickets database.
         
         Args:
             query: Search query
             k: Number of results
+            query_vector: Precomputed query embedding (embedded here if None)
             
         Returns:
             List of documents with source_db metadata
         """
-        docs = self.tickets_store.similarity_search(query, k=k)
-        
-        # Add source_db metadata
-        for doc in docs:
-            doc.metadata["source_db"] = "tickets"
-        
-        return docs
+        # Results come back stamped with source_db by the store
+        return self._batchers["tickets"].search(query, k, query_vector)
     
-    def retrieve_from_memory(self, query: str, k: int = 5) -> List[Document]:
+    def retrieve_from_memory(
+        self,
+        query: str,
+        k: int = 5,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Document]:
         """
         Retrieve from memory database.
         
         Args:
             query: Search query
             k: Number of results
+            query_vector: Precomputed query embedding (embedded here if None)
             
         Returns:
             List of documents with source_db metadata
         """
-        docs = self.memory_store.similarity_search(query, k=k)
-        
-        # Add source_db metadata
-        for doc in docs:
-            doc.metadata["source_db"] = "memory"
+        # Results come back stamped with source_db by the store
+        return self._batchers["memory"].search(query, k, query_vector)
+    
+    def _embed_query(self, query: str) -> tuple:
+        # Tuples keep the cached vectors immutable
+        return tuple(self.embedder.embed_query(query))
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query with the shared embedder, memoized per query string.
         
-        return docs
+        Args:
+            query: Search query
+            
+        Returns:
+            Query vector
+        """
+        return list(self._embed_query_cached(query))
     
     def retrieve_from_multiple(
         self,
         query: str,
         databases: List[str],
-        k: int = 5
+        k: int = 5,
+        query_vector: Optional[List[float]] = None
     ) -> Dict[str, List[Document]]:
         """
-        Retrieve from multiple databases.
+        Retrieve from multiple databases concurrently.
+        
+        The query is embedded once and every selected store is searched on
+        its own thread, so latency is that of the slowest store rather than
+        the sum of all of them.
         
         Args:
             query: Search query
             databases: List of database names to query
             k: Number of results per database
+            query_vector: Precomputed embedding from the shared embedder
+                (looked up or embedded here if None)
             
         Returns:
             Dictionary mapping database name to documents
         """
-        results = {}
+        selected = [db for db in dict.fromkeys(databases) if db in self._retrievers]
+        
+        # Embed the query once for every store sharing the embedder
+        if query_vector is None and any(
+            self._stores[db].embeddings is self.embedder for db in selected
+        ):
+            query_vector = self.embed_query(query)
         
-        for db in databases:
-            if db == "docs":
-                results["docs"] = self.retrieve_from_docs(query, k)
-            elif db == "code":
-                results["code"] = self.retrieve_from_code(query, k)
-            elif db == "tickets":
-                results["tickets"] = self.retrieve_from_tickets(query, k)
-            elif db == "memory":
-                results["memory"] = self.retrieve_from_memory(query, k)
+        futures = {
+            db: _RETRIEVAL_EXECUTOR.submit(
+                self._retrievers[db],
+                query,
+                k,
+                query_vector if self._stores[db].embeddings is self.embedder else None
+            )
+            for db in selected
+        }
         
-        return results
+        return {db: future.result() for db, future in futures.items()}
     
     def get_langchain_tools(self) -> List[Tool]:
         """
@@ -4,52 +4,14 @@ from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
 
-from knoroute.config import settings
+from knoroute.semantic_cache import SemanticCache
+from knoroute._clients import get_embeddings, get_chat_llm, llm_semaphore
 from knoroute.agents.query_understanding import QueryUnderstanding
 
 
-class RoutingDecision(BaseModel):
-    """Structured output for routing decisions."""
-    
-    selected_dbs: List[Literal["docs", "code", "tickets", "memory"]] = Field(
-        description="Which databases to query for this request"
-    )
-    strategy: Literal["parallel", "sequential"] = Field(
-        description="Whether to query databases in parallel or sequentially"
-    )
-    retry_allowed: bool = Field(
-        description="Whether retry is allowed if evidence is insufficient"
-    )
-    reasoning: str = Field(
-        description="Explanation of why these databases were selected"
-    )
-
-
-class RoutingAgent:
-    """
-    LLM-driven routing agent that decides which vector databases to query.
-    No hardcoded rules - uses reasoning to make intelligent decisions.
-    """
-    
-    def __init__(self, llm: Optional[ChatOpenAI] = None):
-        """
-        Initialize the routing agent.
-        
-        Args:
-            llm: Language model instance (creates new if None)
-        """
-        self.llm = llm or ChatOpenAI(
-            model=settings.llm_model,
-            temperature=0,
-            openai_api_key=settings.openai_api_key
-        )
-        
-        self.parser = PydanticOutputParser(pydantic_object=RoutingDecision)
-        
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an intelligent routing agent for an engineering knowledge system.
+# Static system prompt (shared with the fused QueryPlannerAgent)
+ROUTING_SYSTEM_PROMPT = """You are an intelligent routing agent for an engineering knowledge system.
 
 You have access to 4 vector databases:
 1. **docs** - Official documentation (intended behavior, API specs, guides)
@@ -89,9 +51,77 @@ RETRY:
 - Allow retry for complex queries
 - Disallow for simple lookups
 
-Think step-by-step and explain your reasoning.
+FALLBACK (pre-committed second attempt):
+- If retry is allowed, also choose fallback_dbs: the databases to query next
+  if the selected ones turn out to be insufficient (do not repeat selected_dbs)
+- Set fallback_condition to the most likely reason the first attempt falls short:
+  * low_confidence - evidence may be thin or unclear
+  * missing_historical - past incidents or learned patterns may be needed
+  * missing_impl - implementation details may be needed
+
+Think step-by-step and explain your reasoning."""
 
-{format_instructions}"""),
+
+class RoutingDecision(BaseModel):
+    """Structured output for routing decisions."""
+    
+    selected_dbs: List[Literal["docs", "code", "tickets", "memory"]] = Field(
+        description="Which databases to query for this request"
+    )
+    strategy: Literal["parallel", "sequential"] = Field(
+        description="Whether to query databases in parallel or sequentially"
+    )
+    retry_allowed: bool = Field(
+        description="Whether retry is allowed if evidence is insufficient"
+    )
+    reasoning: str = Field(
+        description="Explanation of why these databases were selected"
+    )
+    fallback_dbs: List[Literal["docs", "code", "tickets", "memory"]] = Field(
+        description="Databases to query next if the selected ones are insufficient",
+        default_factory=list
+    )
+    fallback_condition: Literal["low_confidence", "missing_historical", "missing_impl"] = Field(
+        description="Expected reason the first attempt would be insufficient",
+        default="low_confidence"
+    )
+
+
+class RoutingAgent:
+    """
+    LLM-driven routing agent that decides which vector databases to query.
+    
+    No hardcoded rules - uses reasoning to make intelligent decisions. In
+    the workflow it only handles retries; first attempts are routed by
+    QueryPlannerAgent in the same call that understands the query.
+    """
+    
+    def __init__(
+        self,
+        llm: Optional[ChatOpenAI] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
+        """
+        Initialize the routing agent.
+        
+        Args:
+            llm: Language model instance (uses the shared connection pools if None)
+            semantic_cache: Cache for paraphrased queries with the same
+                understanding and retry context (creates new if None)
+        """
+        self.llm = llm or get_chat_llm(temperature=0)
+        
+        self.semantic_cache = semantic_cache or SemanticCache(get_embeddings())
+        
+        # Native tool-call structured output: no schema text in the prompt
+        # and no free-text JSON parsing
+        self.structured_llm = self.llm.with_structured_output(
+            RoutingDecision,
+            method="function_calling"
+        )
+        
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", ROUTING_SYSTEM_PROMPT),
             ("user", """Query: {query}
 
 Understanding:
@@ -105,6 +135,9 @@ Missing aspects: {missing_aspects}
 
 Decide which databases to query and explain why.""")
         ])
+        
+        # The chain is fixed per instance
+        self._chain = self.prompt | self.structured_llm
     
     def route(
         self,
@@ -134,21 +167,32 @@ Decide which databases to query and explain why.""")
         if missing_aspects:
             missing_str = ", ".join(missing_aspects)
         
-        # Create the chain
-        chain = self.prompt | self.llm | self.parser
+        # Paraphrased queries with the same understanding/retry context
+        context_key = "\x1f".join([
+            understanding.intent,
+            understanding.topic,
+            str(understanding.needs_memory),
+            understanding.complexity,
+            prev_attempt_str,
+            missing_str,
+        ])
+        cached = self.semantic_cache.lookup(query, context_key)
+        if cached is not None:
+            return cached
         
         # Execute
-        result = chain.invoke({
-            "query": query,
-            "intent": understanding.intent,
-            "topic": understanding.topic,
-            "needs_memory": understanding.needs_memory,
-            "complexity": understanding.complexity,
-            "previous_attempt": prev_attempt_str,
-            "missing_aspects": missing_str,
-            "format_instructions": self.parser.get_format_instructions()
-        })
+        with llm_semaphore:
+            result = self._chain.invoke({
+                "query": query,
+                "intent": understanding.intent,
+                "topic": understanding.topic,
+                "needs_memory": understanding.needs_memory,
+                "complexity": understanding.complexity,
+                "previous_attempt": prev_attempt_str,
+                "missing_aspects": missing_str
+            })
         
+        self.semantic_cache.add(query, context_key, result)
         return result
 
 
@@ -1,14 +1,20 @@
 """FastAPI application for the Agentic RAG system."""
 
+import asyncio
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
+import orjson
 
 from knoroute.graph import AgenticRAGWorkflow
-from knoroute.agents import GroundedAnswer
+from knoroute.agents import Citation, GroundedAnswer
 from knoroute.config import settings
+from knoroute._clients import aclose_clients
+from knoroute.semantic_cache import SemanticCache
 
 # Configure logging
 logging.basicConfig(
@@ -21,7 +27,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Agentic Knowledge Routing System",
     description="Multi-agent RAG system with intelligent query routing across vector databases",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -36,6 +43,26 @@ app.add_middleware(
 # Initialize workflow (singleton)
 workflow: Optional[AgenticRAGWorkflow] = None
 
+# Answers for paraphrased queries (cleared whenever new data is ingested)
+response_cache: Optional[SemanticCache] = None
+
+# Runs the synchronous workflow/ingestion code off the event loop
+executor: Optional[ThreadPoolExecutor] = None
+
+
+async def run_sync(fn, *args):
+    """
+    Run a blocking call in the executor so the event loop keeps serving requests.
+    
+    Args:
+        fn: Synchronous callable
+        *args: Positional arguments for fn
+        
+    Returns:
+        Whatever fn returns
+    """
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
 
 # Request/Response models
 
@@ -57,7 +84,11 @@ class QueryResponse(BaseModel):
     query: str
     answer: str
     confidence: float
-    citations: list
+    
+    # The agent's Citation instances are passed through as-is: pydantic
+    # does not revalidate model instances, and they were already validated
+    # when the answer was parsed
+    citations: List[Citation]
     learned_insight: Optional[str] = None
 
 
@@ -84,11 +115,21 @@ class IngestRequest(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """Initialize workflow on startup."""
-    global workflow
+    global workflow, executor, response_cache
     logger.info("Initializing Agentic RAG Workflow...")
     
+    executor = ThreadPoolExecutor(
+        max_workers=settings.api_max_threads,
+        thread_name_prefix="knoroute-api"
+    )
+    
     try:
         workflow = AgenticRAGWorkflow()
+        response_cache = SemanticCache(
+            workflow.retriever_tools.embedder,
+            max_entries=settings.response_cache_max_entries,
+            ttl=settings.response_cache_ttl
+        )
         logger.info("✓ Workflow initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize workflow: {e}")
@@ -99,6 +140,11 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("Shutting down Agentic RAG System...")
+    
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    await aclose_clients()
 
 
 # Endpoints
@@ -127,12 +173,16 @@ async def health_check():
     
     try:
         # Check vector store stats
-        vector_stores = {
-            "docs": workflow.docs_store.get_collection_stats(),
-            "code": workflow.code_store.get_collection_stats(),
-            "tickets": workflow.tickets_store.get_collection_stats(),
-            "memory": workflow.memory_store.get_collection_stats(),
+        stores = {
+            "docs": workflow.docs_store,
+            "code": workflow.code_store,
+            "tickets": workflow.tickets_store,
+            "memory": workflow.memory_store,
         }
+        stats = await asyncio.gather(*(
+            run_sync(store.get_collection_stats) for store in stores.values()
+        ))
+        vector_stores = dict(zip(stores, stats))
         
         return HealthResponse(
             status="healthy",
@@ -171,25 +221,30 @@ async def query_endpoint(request: QueryRequest):
     logger.info(f"Processing query: {request.query}")
     
     try:
-        # Execute workflow
-        answer: GroundedAnswer = workflow.query(
-            query=request.query,
-            max_retries=request.max_retries
+        # Near-identical questions reuse a previous answer
+        cache_key = str(request.max_retries)
+        answer: Optional[GroundedAnswer] = await run_sync(
+            response_cache.lookup,
+            request.query,
+            cache_key
         )
         
+        # Execute workflow
+        if answer is None:
+            answer = await run_sync(
+                workflow.query,
+                request.query,
+                request.max_retries
+            )
+            # May embed the query (cold key), so keep it off the event loop
+            await run_sync(response_cache.add, request.query, cache_key, answer)
+        
         # Format response
         response = QueryResponse(
             query=request.query,
             answer=answer.answer,
             confidence=answer.confidence,
-            citations=[
-                {
-                    "source_db": c.source_db,
-                    "chunk_id": c.chunk_id,
-                    "relevance": c.relevance
-                }
-                for c in answer.citations
-            ],
+            citations=answer.citations,
             learned_insight=answer.learned_insight
         )
         
@@ -204,6 +259,34 @@ async def query_endpoint(request: QueryRequest):
         )
 
 
+@app.post("/query/stream", tags=["Query"])
+async def query_stream_endpoint(request: QueryRequest):
+    """
+    Streaming query endpoint (Server-Sent Events).
+    
+    Runs the same workflow as /query but emits an event per workflow step
+    and streams the answer tokens as they are generated. The final
+    ``generate_answer`` update carries the complete answer with citations.
+    """
+    if workflow is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Workflow not initialized"
+        )
+    
+    logger.info(f"Streaming query: {request.query}")
+    
+    async def event_stream():
+        try:
+            async for event in workflow.astream_query(request.query, request.max_retries):
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Streaming query failed: {e}", exc_info=True)
+            yield b"event: error\ndata: " + orjson.dumps({"detail": str(e)}) + b"\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.post("/ingest", tags=["Ingestion"])
 async def ingest_endpoint(request: IngestRequest):
     """
@@ -220,29 +303,10 @@ async def ingest_endpoint(request: IngestRequest):
     logger.info(f"Ingesting {request.db_type} from {request.source}")
     
     try:
-        from knoroute.ingestion import (
-            DocsIngestionPipeline,
-            CodeIngestionPipeline,
-            TicketsIngestionPipeline
-        )
-        
-        if request.db_type == "docs":
-            pipeline = DocsIngestionPipeline(workflow.docs_store)
-            doc_ids = pipeline.ingest_directory(request.source)
-        
-        elif request.db_type == "code":
-            pipeline = CodeIngestionPipeline(workflow.code_store)
-            doc_ids = pipeline.ingest_directory(request.source)
+        doc_ids = await run_sync(_run_ingestion, request)
         
-        elif request.db_type == "tickets":
-            pipeline = TicketsIngestionPipeline(workflow.tickets_store)
-            doc_ids = pipeline.ingest_json(request.source, request.format_type)
-        
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid db_type: {request.db_type}"
-            )
+        # Cached answers may no longer reflect the knowledge base
+        response_cache.clear()
         
         logger.info(f"✓ Ingested {len(doc_ids)} documents")
         
@@ -260,14 +324,62 @@ async def ingest_endpoint(request: IngestRequest):
         )
 
 
+def _run_ingestion(request: IngestRequest) -> List[str]:
+    """Run the ingestion pipeline for a request (blocking)."""
+    from knoroute.ingestion import (
+        DocsIngestionPipeline,
+        CodeIngestionPipeline,
+        TicketsIngestionPipeline
+    )
+    
+    if request.db_type == "docs":
+        pipeline = DocsIngestionPipeline(workflow.docs_store)
+        return pipeline.ingest_directory(request.source)
+    
+    elif request.db_type == "code":
+        pipeline = CodeIngestionPipeline(workflow.code_store)
+        return pipeline.ingest_directory(request.source)
+    
+    elif request.db_type == "tickets":
+        pipeline = TicketsIngestionPipeline(workflow.tickets_store)
+        return pipeline.ingest_json(request.source, request.format_type)
+    
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid db_type: {request.db_type}"
+        )
+
+
 # Run with: uvicorn knoroute.api.main:app --reload
 if __name__ == "__main__":
     import uvicorn
     
-    uvicorn.run(
-        "knoroute.api.main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=settings.api_reload,
-        log_level=settings.log_level.lower()
-    )
+    if settings.api_reload:
+        # Development: one process with hot reload
+        uvicorn.run(
+            "knoroute.api.main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            reload=True,
+            log_level=settings.log_level.lower()
+        )
+    else:
+        # Production: uvloop/httptools event loop. Response cache, search
+        # caches, the FAISS indexes and the Chroma client are all
+        # process-local, and Chroma doesn't support several writer
+        # processes, so more than one worker is opt-in (see README)
+        if settings.api_workers > 1:
+            logger.warning(
+                f"Running {settings.api_workers} workers: caches are per process "
+                "and /ingest must not run concurrently with other workers' writes"
+            )
+        uvicorn.run(
+            "knoroute.api.main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            workers=max(1, settings.api_workers),
+            loop="uvloop",
+            http="httptools",
+            log_level=settings.log_level.lower()
+        )
@@ -5,7 +5,7 @@ Uses Pydantic Settings for type-safe configuration with environment variable sup
 
 import os
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import AliasChoices, Field
 from typing import Literal
 
 
@@ -18,6 +18,14 @@ class Settings(BaseSettings):
     # LLM Model Configuration
     llm_model: str = Field(default="gpt-4-turbo-preview", env="LLM_MODEL")
     embedding_model: str = Field(default="text-embedding-3-small", env="EMBEDDING_MODEL")
+    embedding_batch_size: int = Field(default=256, env="EMBEDDING_BATCH_SIZE")  # texts per embeddings request
+    llm_max_concurrency: int = Field(default=32, env="LLM_MAX_CONCURRENCY")
+    
+    # Embedding Backend Configuration
+    embedding_backend: Literal["openai", "huggingface-onnx"] = Field(default="openai", env="EMBEDDING_BACKEND")
+    local_embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", env="LOCAL_EMBEDDING_MODEL")
+    onnx_model_file: str = Field(default="onnx/model_qint8_avx512_vnni.onnx", env="ONNX_MODEL_FILE")
+    memory_local_embeddings: bool = Field(default=False, env="MEMORY_LOCAL_EMBEDDINGS")  # memory store on local_embedding_model
     
     # Vector Store Configuration
     vector_store_type: Literal["chroma", "faiss"] = Field(default="chroma", env="VECTOR_STORE_TYPE")
@@ -25,12 +33,35 @@ class Settings(BaseSettings):
     
     # Retrieval Configuration
     retrieval_top_k: int = Field(default=5, env="RETRIEVAL_TOP_K")
+    evaluator_top_n: int = Field(default=8, env="EVALUATOR_TOP_N")
+    reranker_model: str = Field(default="", env="RERANKER_MODEL")
+    # Unmeasured precision: keyword overlap can pass irrelevant evidence
+    evaluator_fast_path: bool = Field(default=False, env="EVALUATOR_FAST_PATH")
     max_retry_attempts: int = Field(default=3, env="MAX_RETRY_ATTEMPTS")
     
+    # Answer Cache Configuration
+    answer_cache_path: str = Field(default="./data/answer_cache.sqlite", env="ANSWER_CACHE_PATH")
+    answer_cache_max_entries: int = Field(default=10000, env="ANSWER_CACHE_MAX_ENTRIES")
+    semantic_cache_threshold: float = Field(default=0.97, env="SEMANTIC_CACHE_THRESHOLD")
+    response_cache_max_entries: int = Field(default=10000, env="RESPONSE_CACHE_MAX_ENTRIES")
+    response_cache_ttl: float = Field(default=3600.0, env="RESPONSE_CACHE_TTL")
+    embedding_cache_path: str = Field(default="./data/embedding_cache", env="EMBEDDING_CACHE_PATH")
+    llm_cache_path: str = Field(default="./data/llm_cache.sqlite", env="LLM_CACHE_PATH")
+    llm_cache_max_entries: int = Field(default=10000, env="LLM_CACHE_MAX_ENTRIES")
+    
+    # Ingestion Configuration
+    ingest_workers: int = Field(  # file parsing processes; 1 = in-process
+        default=1,
+        validation_alias=AliasChoices("KNOROUTE_INGEST_WORKERS", "INGEST_WORKERS")
+    )
+    ingest_parallel_min_files: int = Field(default=200, env="INGEST_PARALLEL_MIN_FILES")  # smaller inputs never start a pool
+    
     # API Configuration
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
     api_port: int = Field(default=8000, env="API_PORT")
     api_reload: bool = Field(default=True, env="API_RELOAD")
+    api_workers: int = Field(default=1, env="API_WORKERS")  # processes; >1 needs care, see README (ignored with reload)
+    api_max_threads: int = Field(default=32, env="API_MAX_THREADS")
     
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -43,3 +74,8 @@ class Settings(BaseSettings):
 
 # Global settings instance
 settings = Settings()
+
+# Hot-path values bound once at import
+RETRIEVAL_TOP_K: int = settings.retrieval_top_k
+MAX_RETRIES: int = settings.max_retry_attempts
+LLM_MODEL: str = settings.llm_model
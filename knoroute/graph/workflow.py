@@ -1,15 +1,23 @@
 """LangGraph workflow orchestration for the agentic RAG system."""
 
-from typing import TypedDict, Optional, List, Dict, Literal
+import asyncio
+import hashlib
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional, List, Dict, Literal, Tuple
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.json import parse_partial_json
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
 from knoroute.agents import (
-    QueryUnderstandingAgent,
     QueryUnderstanding,
     RoutingAgent,
     RoutingDecision,
+    QueryPlannerAgent,
     EvaluatorAgent,
     EvaluationResult,
     AnswerAgent,
@@ -23,27 +31,62 @@ from knoroute.vectorstores import (
     MemoryVectorStore
 )
 from knoroute.ingestion import MemoryWriter
-from knoroute.config import settings
+from knoroute._clients import configure_llm_cache, get_embeddings
+from knoroute.semantic_cache import SemanticCache
+from knoroute.config import MAX_RETRIES, RETRIEVAL_TOP_K, settings
 
 
-class GraphState(TypedDict):
-    """State schema for the LangGraph workflow."""
+# Background retrievals started speculatively while the evaluator runs
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Most likely extra database per intent when the router planned no fallback
+_FALLBACK_BY_INTENT = {
+    "debugging": ["tickets", "memory", "code", "docs"],
+    "explanation": ["code", "docs", "memory", "tickets"],
+    "comparison": ["memory", "docs", "code", "tickets"],
+    "how_to": ["code", "memory", "docs", "tickets"],
+}
+
+
+@dataclass(**({"slots": True} if sys.version_info >= (3, 10) else {}))
+class GraphState:
+    """
+    State schema for the LangGraph workflow.
+    
+    Nodes read fields as attributes and return a dict with only the fields
+    they changed.
+    """
     
     # Input
     query: str
     
     # Agent outputs
-    understanding: Optional[QueryUnderstanding]
-    routing: Optional[RoutingDecision]
-    retrieved_docs: Dict[str, List[Document]]
-    merged_context: Optional[List[Document]]
-    evaluation: Optional[EvaluationResult]
-    answer: Optional[GroundedAnswer]
+    understanding: Optional[QueryUnderstanding] = None
+    routing: Optional[RoutingDecision] = None
+    retrieved_docs: Dict[str, List[Document]] = field(default_factory=dict)
+    merged_context: Optional[List[Document]] = None
+    evaluation: Optional[EvaluationResult] = None
+    answer: Optional[GroundedAnswer] = None
+    
+    # Query vector reused by retries and speculative retrieval
+    query_embedding: Optional[List[float]] = None
+    
+    # Speculative retrieval started during evaluation: (databases, future)
+    prefetch: Optional[Tuple[List[str], Future]] = None
     
     # Control flow
-    retry_count: int
-    max_retries: int
-    error: Optional[str]
+    retry_count: int = 0
+    max_retries: int = MAX_RETRIES
+    error: Optional[str] = None
+
+
+def _bind_node(method_name: str):
+    """Graph callable that dispatches to the workflow instance in the run config."""
+    def node(state: GraphState, config: RunnableConfig):
+        return getattr(config["configurable"]["workflow"], method_name)(state)
+    
+    node.__name__ = method_name
+    return node
 
 
 class AgenticRAGWorkflow:
@@ -51,16 +94,22 @@ class AgenticRAGWorkflow:
     LangGraph workflow for agentic RAG with intelligent routing.
     
     Flow:
-    1. Understand query
-    2. Route to appropriate databases
+    1. Understand query (and plan the first route in the same LLM call)
+    2. Route to appropriate databases (re-routed by RoutingAgent on retries)
     3. Retrieve from selected databases
     4. Merge evidence
     5. Evaluate sufficiency
-    6. If insufficient and retries available → back to routing
+    6. If insufficient and retries available → back to routing (the
+       planned fallback databases first, then a fresh routing decision)
     7. Generate answer
     8. Write to memory (if insight exists)
     """
     
+    # The topology is the same for every instance, so the graph is compiled
+    # once per class; each call passes its instance in the run config
+    _compiled_graph = None
+    _compile_lock = threading.Lock()
+    
     def __init__(
         self,
         docs_store: Optional[DocsVectorStore] = None,
@@ -77,16 +126,24 @@ class AgenticRAGWorkflow:
             tickets_store: Tickets vector store
             memory_store: Memory vector store
         """
-        # Initialize vector stores
-        self.docs_store = docs_store or DocsVectorStore()
-        self.code_store = code_store or CodeVectorStore()
-        self.tickets_store = tickets_store or TicketsVectorStore()
-        self.memory_store = memory_store or MemoryVectorStore()
+        # Deterministic (temperature 0) agent calls are memoized on disk
+        configure_llm_cache()
+        
+        # Initialize vector stores (default stores share one embeddings
+        # client so a query is embedded once for all of them)
+        embeddings = get_embeddings()
+        self.docs_store = docs_store or DocsVectorStore(embeddings=embeddings)
+        self.code_store = code_store or CodeVectorStore(embeddings=embeddings)
+        self.tickets_store = tickets_store or TicketsVectorStore(embeddings=embeddings)
+        # (the memory store may instead embed locally, see MemoryVectorStore)
+        self.memory_store = memory_store or MemoryVectorStore(
+            embeddings=None if settings.memory_local_embeddings else embeddings
+        )
         
         # Initialize agents
-        self.understanding_agent = QueryUnderstandingAgent()
-        self.routing_agent = RoutingAgent()
-        self.evaluator_agent = EvaluatorAgent()
+        self.routing_agent = RoutingAgent(semantic_cache=SemanticCache(embeddings))
+        self.planner_agent = QueryPlannerAgent()
+        self.evaluator_agent = EvaluatorAgent(semantic_cache=SemanticCache(embeddings))
         self.answer_agent = AnswerAgent()
         
         # Initialize retriever tools
@@ -100,23 +157,34 @@ class AgenticRAGWorkflow:
         # Initialize memory writer
         self.memory_writer = MemoryWriter(self.memory_store)
         
-        # Build the graph
-        self.graph = self._build_graph()
+        # Shared compiled graph, run against this instance
+        self.graph = self._get_compiled_graph()
+        self._run_config: RunnableConfig = {"configurable": {"workflow": self}}
     
-    def _build_graph(self) -> StateGraph:
+    @classmethod
+    def _get_compiled_graph(cls):
+        """Compile the graph on first use and share it across instances."""
+        if cls.__dict__.get("_compiled_graph") is None:
+            with cls._compile_lock:
+                if cls.__dict__.get("_compiled_graph") is None:
+                    cls._compiled_graph = cls._build_graph()
+        return cls._compiled_graph
+    
+    @classmethod
+    def _build_graph(cls) -> StateGraph:
         """Build the LangGraph workflow."""
         
         # Create graph
         workflow = StateGraph(GraphState)
         
         # Add nodes
-        workflow.add_node("understand_query", self._understand_query)
-        workflow.add_node("route_query", self._route_query)
-        workflow.add_node("retrieve_docs", self._retrieve_docs)
-        workflow.add_node("merge_evidence", self._merge_evidence)
-        workflow.add_node("evaluate_sufficiency", self._evaluate_sufficiency)
-        workflow.add_node("generate_answer", self._generate_answer)
-        workflow.add_node("write_memory", self._write_memory)
+        workflow.add_node("understand_query", _bind_node("_understand_query"))
+        workflow.add_node("route_query", _bind_node("_route_query"))
+        workflow.add_node("retrieve_docs", _bind_node("_retrieve_docs"))
+        workflow.add_node("merge_evidence", _bind_node("_merge_evidence"))
+        workflow.add_node("evaluate_sufficiency", _bind_node("_evaluate_sufficiency"))
+        workflow.add_node("generate_answer", _bind_node("_generate_answer"))
+        workflow.add_node("write_memory", _bind_node("_write_memory"))
         
         # Set entry point
         workflow.set_entry_point("understand_query")
@@ -125,12 +193,21 @@ class AgenticRAGWorkflow:
         workflow.add_edge("understand_query", "route_query")
         workflow.add_edge("route_query", "retrieve_docs")
         workflow.add_edge("retrieve_docs", "merge_evidence")
-        workflow.add_edge("merge_evidence", "evaluate_sufficiency")
+        
+        # Conditional edge: skip evaluation when no retry could follow it
+        workflow.add_conditional_edges(
+            "merge_evidence",
+            _bind_node("_should_evaluate"),
+            {
+                "evaluate": "evaluate_sufficiency",
+                "answer": "generate_answer"
+            }
+        )
         
         # Conditional edge: evaluate → retry or answer
         workflow.add_conditional_edges(
             "evaluate_sufficiency",
-            self._should_retry,
+            _bind_node("_should_retry"),
             {
                 "retry": "route_query",
                 "answer": "generate_answer"
@@ -144,130 +221,211 @@ class AgenticRAGWorkflow:
     
     # Node functions
     
-    def _understand_query(self, state: GraphState) -> GraphState:
-        """Understand the user's query."""
-        understanding = self.understanding_agent.understand(state["query"])
-        state["understanding"] = understanding
-        return state
+    def _understand_query(self, state: GraphState) -> Dict[str, Any]:
+        """Understand the user's query and plan the first routing attempt."""
+        # One fused LLM call yields both the understanding and the routing
+        plan = self.planner_agent.plan(state.query)
+        return {"understanding": plan.understanding, "routing": plan.routing}
     
-    def _route_query(self, state: GraphState) -> GraphState:
+    def _route_query(self, state: GraphState) -> Dict[str, Any]:
         """Route query to appropriate databases."""
-        # Get previous attempt info if retrying
-        previous_dbs = None
-        missing_aspects = None
-        
-        if state["retry_count"] > 0 and state.get("evaluation"):
-            previous_dbs = list(state["retrieved_docs"].keys())
-            missing_aspects = state["evaluation"].missing_aspects
+        # The first attempt was already routed by the query planner (no
+        # evaluation exists until the first retrieval has been assessed)
+        if state.evaluation is None and state.routing:
+            return {}
+        
+        # Reaching this node again after an evaluation is a retry
+        retry_count = state.retry_count + 1
+        
+        # Execute the pre-committed fallback without another LLM hop
+        routing = state.routing
+        fallback_dbs = [
+            db for db in routing.fallback_dbs
+            if db not in state.retrieved_docs
+        ]
+        if fallback_dbs:
+            return {
+                "routing": routing.model_copy(update={
+                    "selected_dbs": fallback_dbs,
+                    "fallback_dbs": []
+                }),
+                "retry_count": retry_count
+            }
         
-        # Make routing decision
+        # Make routing decision with the previous attempt as context
         routing = self.routing_agent.route(
-            query=state["query"],
-            understanding=state["understanding"],
-            previous_attempt=previous_dbs,
-            missing_aspects=missing_aspects
+            query=state.query,
+            understanding=state.understanding,
+            previous_attempt=list(state.retrieved_docs.keys()),
+            missing_aspects=state.evaluation.missing_aspects
         )
         
-        state["routing"] = routing
-        return state
+        return {"routing": routing, "retry_count": retry_count}
     
-    def _retrieve_docs(self, state: GraphState) -> GraphState:
+    def _retrieve_docs(self, state: GraphState) -> Dict[str, Any]:
         """Retrieve documents from selected databases."""
-        selected_dbs = state["routing"].selected_dbs
-        
-        # Retrieve from selected databases
-        retrieved = self.retriever_tools.retrieve_from_multiple(
-            query=state["query"],
-            databases=selected_dbs,
-            k=settings.retrieval_top_k
-        )
+        selected_dbs = state.routing.selected_dbs
+        retrieved = {}
+        
+        # Harvest the speculative retrieval started during evaluation
+        if state.prefetch:
+            prefetched_dbs, future = state.prefetch
+            if any(db in prefetched_dbs for db in selected_dbs):
+                ready = future.result()
+                retrieved = {db: ready[db] for db in selected_dbs if db in ready}
+            else:
+                future.cancel()
+        
+        # Retrieve from the remaining selected databases
+        query_embedding = self._query_embedding(state)
+        remaining = [db for db in selected_dbs if db not in retrieved]
+        if remaining:
+            retrieved.update(self.retriever_tools.retrieve_from_multiple(
+                query=state.query,
+                databases=remaining,
+                k=RETRIEVAL_TOP_K,
+                query_vector=query_embedding
+            ))
         
         # Merge with previous retrieval if retrying
-        if state["retry_count"] > 0 and state.get("retrieved_docs"):
+        if state.retry_count > 0 and state.retrieved_docs:
             # Combine with previous results
+            merged = {db: list(docs) for db, docs in state.retrieved_docs.items()}
             for db, docs in retrieved.items():
-                if db in state["retrieved_docs"]:
-                    state["retrieved_docs"][db].extend(docs)
-                else:
-                    state["retrieved_docs"][db] = docs
-        else:
-            state["retrieved_docs"] = retrieved
+                merged.setdefault(db, []).extend(docs)
+            retrieved = merged
         
-        return state
+        return {
+            "retrieved_docs": retrieved,
+            "query_embedding": query_embedding,
+            "prefetch": None
+        }
     
-    def _merge_evidence(self, state: GraphState) -> GraphState:
+    def _merge_evidence(self, state: GraphState) -> Dict[str, Any]:
         """Merge evidence from all retrieved documents."""
         all_docs = []
         
-        for db, docs in state["retrieved_docs"].items():
+        for db, docs in state.retrieved_docs.items():
             all_docs.extend(docs)
         
-        # Simple deduplication based on content
+        # Deduplicate by stored chunk ID, hashing the full content only for
+        # documents without one
         seen_content = set()
         unique_docs = []
         
         for doc in all_docs:
-            content_hash = hash(doc.page_content[:100])  # Hash first 100 chars
+            content_hash = doc.metadata.get("chunk_id") or hashlib.blake2b(
+                doc.page_content.encode("utf-8"), digest_size=8
+            ).digest()
             if content_hash not in seen_content:
                 seen_content.add(content_hash)
                 unique_docs.append(doc)
         
-        state["merged_context"] = unique_docs
-        return state
+        return {"merged_context": unique_docs}
     
-    def _evaluate_sufficiency(self, state: GraphState) -> GraphState:
+    def _evaluate_sufficiency(self, state: GraphState) -> Dict[str, Any]:
         """Evaluate if evidence is sufficient."""
+        # Overlap the likely retry retrieval with the evaluator call
+        prefetch = None
+        predicted_dbs = self._predict_fallback_dbs(state)
+        if predicted_dbs:
+            prefetch = (predicted_dbs, _PREFETCH_EXECUTOR.submit(
+                self.retriever_tools.retrieve_from_multiple,
+                query=state.query,
+                databases=predicted_dbs,
+                k=RETRIEVAL_TOP_K,
+                query_vector=self._query_embedding(state)
+            ))
+        
         evaluation = self.evaluator_agent.evaluate(
-            query=state["query"],
-            retrieved_docs=state["merged_context"],
-            sources_queried=list(state["retrieved_docs"].keys())
+            query=state.query,
+            retrieved_docs=state.merged_context,
+            sources_queried=list(state.retrieved_docs.keys()),
+            complexity=state.understanding.complexity
         )
         
-        state["evaluation"] = evaluation
-        return state
+        # Sufficient evidence means no retry: discard the speculation
+        if evaluation.is_sufficient and prefetch:
+            prefetch[1].cancel()
+            prefetch = None
+        
+        return {"evaluation": evaluation, "prefetch": prefetch}
+    
+    def _query_embedding(self, state: GraphState) -> List[float]:
+        """The query vector (embedded on first use; memoized by the retriever tools)."""
+        if state.query_embedding is not None:
+            return state.query_embedding
+        return self.retriever_tools.embed_query(state.query)
+    
+    def _predict_fallback_dbs(self, state: GraphState) -> List[str]:
+        """Guess which databases a retry would query (empty if no retry is possible)."""
+        routing = state.routing
+        if state.retry_count >= state.max_retries or not routing.retry_allowed:
+            return []
+        
+        # The router's pre-committed fallback is exactly what a retry runs
+        queried = state.retrieved_docs
+        fallback_dbs = [db for db in routing.fallback_dbs if db not in queried]
+        if fallback_dbs:
+            return fallback_dbs
+        
+        # Otherwise prefetch the most likely unqueried database for the intent
+        for db in _FALLBACK_BY_INTENT.get(state.understanding.intent, []):
+            if db not in queried:
+                return [db]
+        return []
+    
+    def _should_evaluate(self, state: GraphState) -> Literal["evaluate", "answer"]:
+        """Evaluate only if an insufficient verdict could still trigger a retry."""
+        if state.retry_count >= state.max_retries:
+            return "answer"
+        
+        if not state.routing.retry_allowed:
+            return "answer"
+        
+        return "evaluate"
     
     def _should_retry(self, state: GraphState) -> Literal["retry", "answer"]:
         """Decide whether to retry or generate answer."""
-        evaluation = state["evaluation"]
+        evaluation = state.evaluation
         
         # Check if sufficient
         if evaluation.is_sufficient:
             return "answer"
         
         # Check if retries available
-        if state["retry_count"] >= state["max_retries"]:
+        if state.retry_count >= state.max_retries:
             return "answer"  # Give best answer we can
         
         # Check if retry is allowed by routing
-        if not state["routing"].retry_allowed:
+        if not state.routing.retry_allowed:
             return "answer"
         
-        # Increment retry count and retry
-        state["retry_count"] += 1
+        # Retry (route_query counts the attempt: edge functions cannot
+        # update the state)
         return "retry"
     
-    def _generate_answer(self, state: GraphState) -> GraphState:
+    def _generate_answer(self, state: GraphState) -> Dict[str, Any]:
         """Generate grounded answer."""
         answer = self.answer_agent.generate(
-            query=state["query"],
-            retrieved_docs=state["merged_context"]
+            query=state.query,
+            retrieved_docs=state.merged_context
         )
         
-        state["answer"] = answer
-        return state
+        return {"answer": answer}
     
-    def _write_memory(self, state: GraphState) -> GraphState:
+    def _write_memory(self, state: GraphState) -> Dict[str, Any]:
         """Write learned insight to memory."""
-        answer = state["answer"]
+        answer = state.answer
         
         if answer.learned_insight:
             self.memory_writer.write_insight(
                 insight=answer.learned_insight,
-                learned_from=state["query"],
+                learned_from=state.query,
                 confidence=answer.confidence
             )
         
-        return state
+        return {}
     
     # Public interface
     
@@ -282,11 +440,20 @@ class AgenticRAGWorkflow:
         Returns:
             GroundedAnswer with citations
         """
+        # Execute graph
+        final_state = self.graph.invoke(
+            self._initial_state(query, max_retries),
+            self._run_config
+        )
+        
+        return final_state["answer"]
+    
+    def _initial_state(self, query: str, max_retries: Optional[int]) -> Dict[str, Any]:
+        """Build the graph input for a query."""
         if max_retries is None:
-            max_retries = settings.max_retry_attempts
+            max_retries = MAX_RETRIES
         
-        # Initialize state
-        initial_state: GraphState = {
+        return {
             "query": query,
             "understanding": None,
             "routing": None,
@@ -294,15 +461,135 @@ class AgenticRAGWorkflow:
             "merged_context": None,
             "evaluation": None,
             "answer": None,
+            "query_embedding": None,
+            "prefetch": None,
             "retry_count": 0,
             "max_retries": max_retries,
             "error": None
         }
+    
+    async def aquery(self, query: str, max_retries: int = None) -> GroundedAnswer:
+        """
+        Execute the workflow for a query without blocking the event loop.
         
-        # Execute graph
-        final_state = self.graph.invoke(initial_state)
+        Independent queries can be dispatched concurrently with
+        ``asyncio.gather``; each runs ``query`` in a worker thread.
         
-        return final_state["answer"]
+        Args:
+            query: User's query
+            max_retries: Maximum retry attempts (default from settings)
+            
+        Returns:
+            GroundedAnswer with citations
+        """
+        return await asyncio.to_thread(self.query, query, max_retries)
+    
+    async def astream_query(
+        self,
+        query: str,
+        max_retries: int = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the workflow for a query, yielding events as it progresses.
+        
+        Each node transition yields ``{"event": "update", "node", "data"}``
+        with a JSON-serializable summary of what the node produced, and the
+        answer text is yielded incrementally as
+        ``{"event": "token", "node": "generate_answer", "content"}``.
+        The answer LLM emits a GroundedAnswer JSON object; token events carry
+        only the new characters of its ``answer`` field, not the raw JSON.
+        A cached answer is not streamed by the LLM and arrives as a single
+        token event. The last update event carries the final answer.
+        
+        Args:
+            query: User's query
+            max_retries: Maximum retry attempts (default from settings)
+            
+        Yields:
+            Event dictionaries
+        """
+        raw = ""
+        streamed = ""
+        
+        async for mode, chunk in self.graph.astream(
+            self._initial_state(query, max_retries),
+            self._run_config,
+            stream_mode=["updates", "messages"]
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if metadata.get("langgraph_node") == "generate_answer" and message.content:
+                    raw += message.content
+                    text = self._partial_answer_text(raw)
+                    if text.startswith(streamed) and len(text) > len(streamed):
+                        yield {
+                            "event": "token",
+                            "node": "generate_answer",
+                            "content": text[len(streamed):]
+                        }
+                        streamed = text
+                continue
+            
+            for node, update in chunk.items():
+                if node == "generate_answer" and update:
+                    # Cache hits never reach the LLM; send the rest of the text at once
+                    text = update["answer"].answer
+                    if text.startswith(streamed) and len(text) > len(streamed):
+                        yield {
+                            "event": "token",
+                            "node": "generate_answer",
+                            "content": text[len(streamed):]
+                        }
+                    raw = ""
+                    streamed = ""
+                yield {
+                    "event": "update",
+                    "node": node,
+                    "data": self._summarize_update(node, update)
+                }
+    
+    @staticmethod
+    def _partial_answer_text(raw: str) -> str:
+        """The ``answer`` field of a partially streamed GroundedAnswer JSON object."""
+        start = raw.find("{")
+        if start < 0:
+            return ""
+        
+        # The model may wrap the object in a ```json fence; drop anything after it
+        body = raw[start:].split("```", 1)[0]
+        partial = parse_partial_json(body)
+        if not isinstance(partial, dict):
+            return ""
+        text = partial.get("answer")
+        return text if isinstance(text, str) else ""
+    
+    @staticmethod
+    def _summarize_update(node: str, update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Reduce a node's state update to the JSON-serializable part it produced."""
+        if not update:
+            return {}
+        
+        if node == "understand_query":
+            return {
+                "understanding": update["understanding"].model_dump(),
+                "routing": update["routing"].model_dump()
+            }
+        elif node == "route_query":
+            return {
+                "routing": update["routing"].model_dump(),
+                "retry_count": update["retry_count"]
+            }
+        elif node == "retrieve_docs":
+            return {
+                "retrieved": {db: len(docs) for db, docs in update["retrieved_docs"].items()}
+            }
+        elif node == "merge_evidence":
+            return {"merged_docs": len(update["merged_context"])}
+        elif node == "evaluate_sufficiency":
+            return {"evaluation": update["evaluation"].model_dump()}
+        elif node == "generate_answer":
+            return {"answer": update["answer"].model_dump()}
+        return {}
     
     def get_graph_visualization(self) -> str:
         """Get ASCII visualization of the graph."""
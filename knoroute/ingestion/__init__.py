@@ -1,9 +1,22 @@
 """Ingestion pipelines package."""
 
-from .docs_ingest import DocsIngestionPipeline
-from .code_ingest import CodeIngestionPipeline
-from .tickets_ingest import TicketsIngestionPipeline
-from .memory_writer import MemoryWriter
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .docs_ingest import DocsIngestionPipeline
+    from .code_ingest import CodeIngestionPipeline
+    from .tickets_ingest import TicketsIngestionPipeline
+    from .memory_writer import MemoryWriter
+
+# Pipelines pull in LangChain loaders and splitters: each is imported on
+# first access (PEP 562) so importing the package stays cheap
+_LAZY_IMPORTS = {
+    "DocsIngestionPipeline": ".docs_ingest",
+    "CodeIngestionPipeline": ".code_ingest",
+    "TicketsIngestionPipeline": ".tickets_ingest",
+    "MemoryWriter": ".memory_writer",
+}
 
 __all__ = [
     "DocsIngestionPipeline",
@@ -11,3 +24,16 @@ __all__ = [
     "TicketsIngestionPipeline",
     "MemoryWriter",
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
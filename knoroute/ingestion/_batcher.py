@@ -0,0 +1,87 @@
+"""Token-aware batching helpers for embedding calls."""
+
+import random
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+from openai import RateLimitError
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/code)."""
+    return len(text) // 4
+
+
+def pack_by_tokens(
+    chunks: Iterable[Document],
+    max_tokens: int = 8000,
+    est: Callable[[str], int] = estimate_tokens,
+    max_items: Optional[int] = None
+) -> Iterator[List[Document]]:
+    """
+    Pack chunks into batches that stay under an estimated token budget.
+
+    Small chunks are grouped together until the budget is reached; a chunk
+    larger than the budget on its own is emitted as a single-item batch.
+
+    Args:
+        chunks: Documents to batch
+        max_tokens: Estimated token budget per batch
+        est: Function estimating the token count of a string
+        max_items: Optional cap on the number of chunks per batch
+
+    Yields:
+        Lists of documents
+    """
+    batch: List[Document] = []
+    batch_tokens = 0
+
+    for chunk in chunks:
+        tokens = est(chunk.page_content)
+
+        if batch and (
+            batch_tokens + tokens > max_tokens
+            or (max_items is not None and len(batch) >= max_items)
+        ):
+            yield batch
+            batch = []
+            batch_tokens = 0
+
+        batch.append(chunk)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+def with_backoff(
+    fn: Callable,
+    *args,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+    **kwargs
+):
+    """
+    Call ``fn`` and retry with exponential backoff when rate limited (HTTP 429).
+
+    Args:
+        fn: Callable to invoke
+        max_retries: Retries before the RateLimitError is re-raised
+        base_delay: Delay in seconds before the first retry
+        max_delay: Upper bound on a single delay
+
+    Returns:
+        Whatever ``fn`` returns
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return fn(*args, **kwargs)
+        except RateLimitError:
+            if attempt == max_retries:
+                raise
+
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            time.sleep(delay * random.uniform(0.5, 1.0))
@@ -0,0 +1,217 @@
+"""Persistent record of already-ingested chunks, keyed by content hash."""
+
+import functools
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Set
+
+from langchain_core.documents import Document
+
+
+# Metadata left out of chunk hashes: the hash itself, and created_at, which
+# parsers fill with the current time when a record has none
+_UNHASHED_KEYS = frozenset({"content_hash", "created_at"})
+
+
+def chunk_hash(doc: Document) -> str:
+    """
+    Hash a chunk's content together with its metadata.
+
+    Args:
+        doc: Chunk to hash (``content_hash`` and ``created_at`` are ignored)
+
+    Returns:
+        16-character hex digest
+    """
+    metadata = sorted(
+        (key, str(value)) for key, value in doc.metadata.items()
+        if key not in _UNHASHED_KEYS
+    )
+    digest = hashlib.blake2b(doc.page_content.encode("utf-8"), digest_size=8)
+    digest.update(repr(metadata).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ChunkCache:
+    """
+    SQLite set of chunk hashes already written to each vector store.
+
+    Ingestion filters its chunks through ``filter_new`` and records them with
+    the ``marking`` write wrapper, so re-running an ingest only embeds chunks
+    that are new or changed. Hashes are namespaced per store (see
+    ``chunk_namespace`` on the stores). The pipelines keep the file in the
+    store's own directory (``chunk_cache_path``), so wiping a store wipes its
+    hashes too, and clear the namespace before ingesting into an empty store;
+    deleting a collection clears its namespace as well.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the cache (the database is opened on first use).
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                "namespace TEXT NOT NULL, hash TEXT NOT NULL, "
+                "PRIMARY KEY (namespace, hash)) WITHOUT ROWID"
+            )
+        return self._conn
+
+    def seen(self, hashes: List[str], namespace: str = "") -> Set[str]:
+        """
+        Return the subset of ``hashes`` already recorded.
+
+        Args:
+            hashes: Chunk hashes to check
+            namespace: Store the hashes belong to
+
+        Returns:
+            Set of known hashes
+        """
+        if not hashes:
+            return set()
+
+        found: Set[str] = set()
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                rows = conn.execute(
+                    "SELECT hash FROM chunks WHERE namespace = ? AND hash IN "
+                    f"({','.join('?' * len(batch))})",
+                    (namespace, *batch)
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def mark(self, hashes: Iterable[str], namespace: str = ""):
+        """
+        Record chunk hashes as ingested.
+
+        Args:
+            hashes: Chunk hashes to record
+            namespace: Store the hashes belong to
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR IGNORE INTO chunks (namespace, hash) VALUES (?, ?)",
+                ((namespace, h) for h in hashes)
+            )
+            conn.commit()
+
+    def clear(self, namespace: Optional[str] = None):
+        """
+        Forget recorded hashes.
+
+        Args:
+            namespace: Store to forget (every store if None)
+        """
+        with self._lock:
+            conn = self._connect()
+            if namespace is None:
+                conn.execute("DELETE FROM chunks")
+            else:
+                conn.execute("DELETE FROM chunks WHERE namespace = ?", (namespace,))
+            conn.commit()
+
+    def filter_new(
+        self,
+        documents: Iterable[Document],
+        namespace: str = "",
+        batch_size: int = 256
+    ) -> Iterator[Document]:
+        """
+        Lazily drop chunks that were already ingested (or repeat in this run).
+
+        Each yielded chunk carries its hash in ``metadata["content_hash"]``.
+
+        Args:
+            documents: Chunks to filter (may be a lazy iterator)
+            namespace: Store the chunks are destined for
+            batch_size: Chunks looked up per database query
+
+        Yields:
+            Chunks that still need embedding
+        """
+        pending: List[Document] = []
+        emitted: Set[str] = set()
+
+        def drain():
+            hashes = [doc.metadata["content_hash"] for doc in pending]
+            known = self.seen(hashes, namespace)
+            for doc, h in zip(pending, hashes):
+                if h not in known and h not in emitted:
+                    emitted.add(h)
+                    yield doc
+            pending.clear()
+
+        for doc in documents:
+            doc.metadata["content_hash"] = chunk_hash(doc)
+            pending.append(doc)
+            if len(pending) >= batch_size:
+                yield from drain()
+
+        if pending:
+            yield from drain()
+
+    @contextmanager
+    def marking(
+        self,
+        write_fn: Callable[..., List[str]],
+        namespace: str = "",
+        save_fn: Optional[Callable[[], None]] = None
+    ) -> Iterator[Callable[..., List[str]]]:
+        """
+        Wrap a ``write_fn(documents, **kwargs)`` to record chunks once written.
+
+        Without ``save_fn`` each batch is recorded as soon as it is written.
+        Stores that hold writes in memory pass their flush as ``save_fn``:
+        hashes are then kept until the block exits and recorded only after
+        ``save_fn`` has put the vectors on disk, so a killed process never
+        leaves hashes behind for vectors it lost.
+
+        Args:
+            write_fn: Vector store write function
+            namespace: Store the chunks are written to
+            save_fn: Flush making the written chunks durable, if needed
+
+        Yields:
+            Wrapped write function
+        """
+        held: List[str] = []
+
+        @functools.wraps(write_fn)
+        def wrapper(documents: List[Document], **kwargs) -> List[str]:
+            ids = write_fn(documents, **kwargs)
+            hashes = [
+                doc.metadata["content_hash"] for doc in documents
+                if "content_hash" in doc.metadata
+            ]
+            if save_fn is None:
+                self.mark(hashes, namespace)
+            else:
+                held.extend(hashes)
+            return ids
+
+        try:
+            yield wrapper
+        finally:
+            # Whatever was written before a failure is still saved and recorded
+            if save_fn is not None:
+                save_fn()
+                self.mark(held, namespace)
@@ -0,0 +1,35 @@
+"""Process pools for CPU-bound ingestion steps (parsing, chunking)."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from knoroute.config import settings
+
+
+def ingestion_pool(num_items: int, workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    Return a process pool for ``num_items`` work items, or None to run in-process.
+
+    Ingestion runs next to embedding threads and open HTTP pools (and
+    inside the API's thread pool), and forking a multithreaded process can
+    deadlock on locks those threads hold, so workers are spawned. Spawning
+    costs about a second per worker, so inputs smaller than
+    ``settings.ingest_parallel_min_files`` never start a pool.
+
+    Args:
+        num_items: Number of files to process
+        workers: Worker processes (settings.ingest_workers if None)
+
+    Returns:
+        ProcessPoolExecutor, or None when the work should stay in-process
+    """
+    if workers is None:
+        workers = settings.ingest_workers
+    if workers <= 1 or num_items < settings.ingest_parallel_min_files:
+        return None
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn")
+    )
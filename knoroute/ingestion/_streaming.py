@@ -0,0 +1,158 @@
+"""Bounded producer/consumer ingestion: chunk -> embed -> write."""
+
+import gc
+import queue
+import threading
+from typing import Callable, Iterable, List, Set
+
+from langchain_core.documents import Document
+
+from knoroute.ingestion._batcher import pack_by_tokens, with_backoff
+
+
+# Sentinel telling a consumer thread that its input is exhausted
+_DONE = object()
+
+# Embedding backends already warmed up in this process (by id of the client)
+_warmed: Set[int] = set()
+_warm_lock = threading.Lock()
+
+
+def warm_up(embed_fn: Callable[[List[str]], List[List[float]]]):
+    """
+    Embed a throwaway string once per embeddings client.
+
+    The first call loads the model (local backends) or tokenizer files and
+    opens the connection (API backends). Doing it before the worker threads
+    start keeps them from all blocking on that cold start. Failures are
+    ignored: the real batches will surface them.
+
+    Args:
+        embed_fn: Batch embedding function (e.g. ``embeddings.embed_documents``)
+    """
+    key = id(getattr(embed_fn, "__self__", embed_fn))
+    with _warm_lock:
+        if key in _warmed:
+            return
+        try:
+            embed_fn(["warmup"])
+        except Exception:
+            return
+        _warmed.add(key)
+
+
+def stream_ingest(
+    chunks: Iterable[Document],
+    embed_fn: Callable[[List[str]], List[List[float]]],
+    write_fn: Callable[..., List[str]],
+    batch_size: int = 64,
+    max_tokens: int = 8000,
+    n_workers: int = 4,
+    queue_size: int = 8,
+    shard_size: int = 256
+) -> List[str]:
+    """
+    Embed and store chunks as they are produced, keeping memory bounded.
+
+    The calling thread packs chunks into embedding batches and feeds them to
+    a bounded queue; ``n_workers`` threads embed batches concurrently and a
+    single writer thread accumulates results into shards of ``shard_size``
+    documents before calling ``write_fn``. Peak memory is a handful of
+    batches rather than the whole corpus.
+
+    Args:
+        chunks: Lazily produced documents to ingest
+        embed_fn: Batch embedding function (e.g. ``embeddings.embed_documents``)
+        write_fn: ``write_fn(documents, embeddings=vectors)`` returning IDs
+        batch_size: Maximum chunks per embedding request
+        max_tokens: Estimated token budget per embedding request
+        n_workers: Number of concurrent embedding threads
+        queue_size: Maximum number of batches buffered between stages
+        shard_size: Documents accumulated before each write
+
+    Returns:
+        List of document IDs (in write order)
+    """
+    embed_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    write_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    doc_ids: List[str] = []
+    errors: List[BaseException] = []
+    failed = threading.Event()
+
+    def embed_worker():
+        while True:
+            batch = embed_queue.get()
+            if batch is _DONE:
+                return
+            if failed.is_set():
+                continue
+            try:
+                texts = [chunk.page_content for chunk in batch]
+                vectors = with_backoff(embed_fn, texts)
+                write_queue.put((batch, vectors))
+            except BaseException as e:
+                errors.append(e)
+                failed.set()
+
+    def writer():
+        shard_docs: List[Document] = []
+        shard_vectors: List[List[float]] = []
+
+        def flush():
+            doc_ids.extend(write_fn(shard_docs, embeddings=shard_vectors))
+            shard_docs.clear()
+            shard_vectors.clear()
+            # Release the flushed shard before the next one fills up
+            gc.collect()
+
+        while True:
+            item = write_queue.get()
+            if item is _DONE:
+                break
+            if failed.is_set():
+                continue
+            try:
+                batch, vectors = item
+                shard_docs.extend(batch)
+                shard_vectors.extend(vectors)
+                if len(shard_docs) >= shard_size:
+                    flush()
+            except BaseException as e:
+                errors.append(e)
+                failed.set()
+
+        if shard_docs and not failed.is_set():
+            try:
+                flush()
+            except BaseException as e:
+                errors.append(e)
+                failed.set()
+
+    warm_up(embed_fn)
+
+    workers = [
+        threading.Thread(target=embed_worker, daemon=True)
+        for _ in range(max(1, n_workers))
+    ]
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    for worker in workers:
+        worker.start()
+    writer_thread.start()
+
+    try:
+        for batch in pack_by_tokens(chunks, max_tokens=max_tokens, max_items=batch_size):
+            if failed.is_set():
+                break
+            embed_queue.put(batch)
+    finally:
+        for _ in workers:
+            embed_queue.put(_DONE)
+        for worker in workers:
+            worker.join()
+        write_queue.put(_DONE)
+        writer_thread.join()
+
+    if errors:
+        raise errors[0]
+
+    return doc_ids
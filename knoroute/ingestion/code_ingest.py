@@ -2,13 +2,20 @@
 
 import os
 import ast
+import hashlib
+from fnmatch import fnmatch
+from functools import partial
+from itertools import chain
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Iterable, Iterator, List, Optional, Dict
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
+from langchain_text_splitters import Language, RecursiveCharacterTextSplitter
 
 from knoroute.vectorstores import CodeVectorStore
+from knoroute.ingestion._streaming import stream_ingest
+from knoroute.ingestion._hash_cache import ChunkCache
+from knoroute.ingestion._process_pool import ingestion_pool
+from knoroute.config import settings
 
 
 class CodeIngestionPipeline:
@@ -31,19 +38,64 @@ class CodeIngestionPipeline:
         ".c": "c",
     }
     
-    def __init__(self, vector_store: Optional[CodeVectorStore] = None):
+    # Language-aware separators for the splitter fallback
+    SPLITTER_LANGUAGES = {
+        "python": Language.PYTHON,
+        "javascript": Language.JS,
+        "typescript": Language.TS,
+        "java": Language.JAVA,
+        "go": Language.GO,
+        "rust": Language.RUST,
+        "cpp": Language.CPP,
+        "c": Language.CPP,
+    }
+    
+    def __init__(
+        self,
+        vector_store: Optional[CodeVectorStore] = None,
+        batch_size: int = 64,
+        max_batch_tokens: int = 8000,
+        embed_workers: int = 4,
+        chunk_workers: Optional[int] = None,
+        chunk_cache: Optional[ChunkCache] = None
+    ):
         """
         Initialize the code ingestion pipeline.
         
         Args:
             vector_store: CodeVectorStore instance (creates new if None)
+            batch_size: Number of chunks embedded per API request
+            max_batch_tokens: Estimated token budget per API request
+            embed_workers: Number of concurrent embedding threads
+            chunk_workers: Processes parsing/chunking files in ingest_directory
+                (settings.ingest_workers if None; 1 chunks in-process, and
+                directories below settings.ingest_parallel_min_files files
+                are always chunked in-process)
+            chunk_cache: Hashes of chunks already ingested, used to skip
+                unchanged chunks on re-runs (one in the store's directory if None)
         """
         self.vector_store = vector_store or CodeVectorStore()
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.embed_workers = embed_workers
+        self.chunk_cache = chunk_cache or ChunkCache(self.vector_store.chunk_cache_path)
+        self.chunk_workers = chunk_workers or settings.ingest_workers
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1500,
             chunk_overlap=200,
             separators=["\n\nclass ", "\n\ndef ", "\n\nfunction ", "\n\n", "\n", " "],
         )
+        
+        # Per-language splitters, built on first use
+        self._splitters: Dict[str, RecursiveCharacterTextSplitter] = {}
+    
+    def __getstate__(self):
+        # Chunking workers only need the splitter; the store and the chunk
+        # cache (open database connections) stay here
+        state = self.__dict__.copy()
+        state["vector_store"] = None
+        state["chunk_cache"] = None
+        return state
     
     def load_directory(
         self,
@@ -60,23 +112,65 @@ class CodeIngestionPipeline:
         Returns:
             List of loaded documents
         """
-        loader = DirectoryLoader(
-            directory_path,
-            glob=glob_pattern,
-            loader_cls=TextLoader,
-            loader_kwargs={"encoding": "utf-8"},
-            show_progress=True,
-        )
+        return list(self.iter_directory(directory_path, glob_pattern))
+    
+    def iter_directory(
+        self,
+        directory_path: str,
+        glob_pattern: str = "**/*.py"
+    ) -> Iterator[Document]:
+        """
+        Lazily load code files from a directory, one file at a time.
         
-        documents = loader.load()
+        Args:
+            directory_path: Path to code directory
+            glob_pattern: File pattern to match
+            
+        Yields:
+            Loaded documents with code metadata
+        """
+        for file_path in self.iter_file_paths(directory_path, glob_pattern):
+            yield self._read_file(file_path)
+    
+    def iter_file_paths(
+        self,
+        directory_path: str,
+        glob_pattern: str = "**/*.py"
+    ) -> Iterator[str]:
+        """
+        Walk a directory with ``os.scandir`` and yield matching file paths.
         
-        # Add metadata
-        for doc in documents:
-            file_path = doc.metadata.get("source", "")
-            doc.metadata["file_path"] = file_path
-            doc.metadata["language"] = self._detect_language(file_path)
+        Patterns of the form ``**/<name>`` or ``<name>`` are matched on file
+        names during the walk (hidden files and directories are skipped);
+        anything more elaborate falls back to ``Path.glob``.
         
-        return documents
+        Args:
+            directory_path: Path to code directory
+            glob_pattern: File pattern to match
+            
+        Yields:
+            File paths in directory order
+        """
+        recursive = glob_pattern.startswith("**/")
+        name_pattern = glob_pattern[3:] if recursive else glob_pattern
+        
+        if "/" in name_pattern or "**" in name_pattern:
+            for path in Path(directory_path).glob(glob_pattern):
+                if path.is_file():
+                    yield str(path)
+            return
+        
+        pending = [directory_path]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            pending.append(entry.path)
+                    elif entry.is_file() and fnmatch(entry.name, name_pattern):
+                        yield entry.path
     
     def load_file(self, file_path: str) -> List[Document]:
         """
@@ -88,15 +182,21 @@ class CodeIngestionPipeline:
         Returns:
             List of documents
         """
-        loader = TextLoader(file_path, encoding="utf-8")
-        documents = loader.load()
-        
-        # Add metadata
-        for doc in documents:
-            doc.metadata["file_path"] = file_path
-            doc.metadata["language"] = self._detect_language(file_path)
+        return [self._read_file(file_path)]
+    
+    def _read_file(self, file_path: str) -> Document:
+        """Read one source file into a Document with code metadata."""
+        with open(file_path, encoding="utf-8") as f:
+            content = f.read()
         
-        return documents
+        return Document(
+            page_content=content,
+            metadata={
+                "source": file_path,
+                "file_path": file_path,
+                "language": self._detect_language(file_path),
+            }
+        )
     
     def extract_functions_python(self, code: str, file_path: str) -> List[Document]:
         """
@@ -114,6 +214,9 @@ class CodeIngestionPipeline:
         try:
             tree = ast.parse(code)
             
+            # Split once per file, not once per function/class
+            lines = code.split('\n')
+            
             for node in ast.walk(tree):
                 if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
                     # Get the source code for this function/class
@@ -121,7 +224,6 @@ class CodeIngestionPipeline:
                     end_line = node.end_lineno if hasattr(node, 'end_lineno') else start_line
                     
                     # Extract the code
-                    lines = code.split('\n')
                     func_code = '\n'.join(lines[start_line-1:end_line])
                     
                     # Get docstring if available
@@ -171,7 +273,7 @@ class CodeIngestionPipeline:
                     continue
             
             # For other languages or if extraction fails, use text splitter
-            chunks = self.text_splitter.split_documents([doc])
+            chunks = self._get_splitter(language).split_documents([doc])
             
             # Add line range metadata to chunks
             for i, chunk in enumerate(chunks):
@@ -180,8 +282,90 @@ class CodeIngestionPipeline:
             
             chunked_docs.extend(chunks)
         
+        # Deterministic IDs: re-ingesting unchanged code maps onto the same
+        # records, and downstream caches can key on the chunk
+        for chunk in chunked_docs:
+            chunk.metadata["chunk_id"] = self._chunk_id(chunk)
+        
         return chunked_docs
     
+    def _get_splitter(self, language: str) -> RecursiveCharacterTextSplitter:
+        """
+        Get the text splitter for a language (the generic one if unsupported).
+        
+        Args:
+            language: Language name from LANGUAGE_EXTENSIONS
+            
+        Returns:
+            Text splitter using that language's syntax separators
+        """
+        splitter = self._splitters.get(language)
+        if splitter is None:
+            if language in self.SPLITTER_LANGUAGES:
+                splitter = RecursiveCharacterTextSplitter.from_language(
+                    self.SPLITTER_LANGUAGES[language],
+                    chunk_size=1500,
+                    chunk_overlap=200,
+                )
+            else:
+                splitter = self.text_splitter
+            self._splitters[language] = splitter
+        return splitter
+    
+    @staticmethod
+    def _chunk_id(chunk: Document) -> str:
+        """Stable ID derived from a chunk's location and content."""
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(chunk.metadata.get("file_path", "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.metadata.get("function_name", "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.metadata.get("line_range", "").encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(chunk.page_content.encode("utf-8"))
+        return digest.hexdigest()
+    
+    def chunk_file(self, file_path: str, extract_functions: bool = True) -> List[Document]:
+        """
+        Load and chunk a single code file.
+        
+        Args:
+            file_path: Path to the code file
+            extract_functions: Whether to extract individual functions
+            
+        Returns:
+            Code chunks ready for embedding
+        """
+        documents = self.load_file(file_path)
+        
+        if extract_functions:
+            documents = self.chunk_documents(documents)
+        
+        return documents
+    
+    def iter_chunks(
+        self,
+        directory_path: str,
+        glob_pattern: str = "**/*.py",
+        extract_functions: bool = True
+    ) -> Iterator[Document]:
+        """
+        Lazily load and chunk code files one at a time.
+        
+        Args:
+            directory_path: Path to code directory
+            glob_pattern: File pattern to match
+            extract_functions: Whether to extract individual functions
+            
+        Yields:
+            Code chunks ready for embedding
+        """
+        for doc in self.iter_directory(directory_path, glob_pattern):
+            if extract_functions:
+                yield from self.chunk_documents([doc])
+            else:
+                yield doc
+    
     def ingest_directory(
         self,
         directory_path: str,
@@ -199,15 +383,24 @@ class CodeIngestionPipeline:
         Returns:
             List of document IDs
         """
-        # Load documents
-        documents = self.load_directory(directory_path, glob_pattern)
+        pool = None
+        if self.chunk_workers > 1:
+            file_paths = list(self.iter_file_paths(directory_path, glob_pattern))
+            pool = ingestion_pool(len(file_paths), self.chunk_workers)
         
-        # Chunk/extract functions
-        if extract_functions:
-            documents = self.chunk_documents(documents)
-        
-        # Add to vector store
-        doc_ids = self.vector_store.add_documents(documents)
+        if pool is not None:
+            # Parsing is CPU-bound: chunk large directories in parallel processes
+            with pool:
+                chunks = chain.from_iterable(pool.map(
+                    partial(self.chunk_file, extract_functions=extract_functions),
+                    file_paths,
+                    chunksize=16
+                ))
+                doc_ids = self._persist(chunks)
+        else:
+            # Stream chunks into the store so memory stays bounded
+            chunks = self.iter_chunks(directory_path, glob_pattern, extract_functions)
+            doc_ids = self._persist(chunks)
         
         print(f"✓ Ingested {len(doc_ids)} code chunks from {directory_path}")
         return doc_ids
@@ -235,7 +428,7 @@ class CodeIngestionPipeline:
             documents = self.chunk_documents(documents)
         
         # Add to vector store
-        doc_ids = self.vector_store.add_documents(documents)
+        doc_ids = self._persist(documents)
         
         print(f"✓ Ingested {len(doc_ids)} code chunks from {file_path}")
         return doc_ids
@@ -250,8 +443,35 @@ class CodeIngestionPipeline:
         Returns:
             Language name
         """
-        ext = Path(file_path).suffix.lower()
+        ext = os.path.splitext(file_path)[1].lower()
         return self.LANGUAGE_EXTENSIONS.get(ext, "unknown")
+    
+    def _persist(self, documents: Iterable[Document]) -> List[str]:
+        """
+        Stream new or changed documents through concurrent embedding into the store.
+        
+        Args:
+            documents: Documents to embed and store (may be a lazy iterator)
+            
+        Returns:
+            List of document IDs
+        """
+        # Unchanged chunks from earlier runs are skipped before embedding
+        namespace = self.vector_store.chunk_namespace
+        if self.vector_store.get_collection_stats()["count"] == 0:
+            # The hashes outlived the data (store wiped or recreated)
+            self.chunk_cache.clear(namespace)
+        # FAISS keeps writes in memory: hashes are recorded after save()
+        save_fn = None if self.vector_store.persists_writes else self.vector_store.save
+        with self.chunk_cache.marking(self.vector_store.add_documents, namespace, save_fn) as write_fn:
+            return stream_ingest(
+                self.chunk_cache.filter_new(documents, namespace),
+                embed_fn=self.vector_store.embeddings.embed_documents,
+                write_fn=write_fn,
+                batch_size=self.batch_size,
+                max_tokens=self.max_batch_tokens,
+                n_workers=self.embed_workers,
+            )
 
 
 # Example usage
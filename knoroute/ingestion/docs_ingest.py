@@ -1,18 +1,16 @@
 # ingestion/docs_ingest.py
-import sys
 import os
-
-# Add the project root to sys.path so knoroute can be imported
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
+import re
+from itertools import chain
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import MarkdownHeaderTextSplitter
 from langchain_core.documents import Document
 
-from knoroute.vectorstores.docs_db import get_docs_vectorstore
+from knoroute.vectorstores.docs_db import DocsVectorStore
+from knoroute.ingestion._streaming import stream_ingest
+from knoroute.ingestion._hash_cache import ChunkCache
+from knoroute.ingestion._process_pool import ingestion_pool
 
 
 # ---------------------------------------------------
@@ -21,19 +19,29 @@ from knoroute.vectorstores.docs_db import get_docs_vectorstore
 
 DOCS_PATH = "data/docs"
 
-IGNORED_DIRS = {
+# Pruned during the directory walk, before their contents are listed
+IGNORED_DIRS = frozenset({
     "img",
     "css",
     "js",
     "learn",
     "tutorial",
     "about",
-    "about",
     ".github",
-}
+})
 
 MIN_CONTENT_LENGTH = 200  # skip tiny markdown files
 
+# Markdown headers split on (#, ##, ###) and the metadata key for each level
+_HDR_RE = re.compile(r"^(#{1,3})[ \t]+(.+)$", re.M)
+_HEADER_KEYS = ("title", "section", "subsection")
+
+# Fenced code blocks (``` or ~~~), where "#" starts a comment, not a header
+_FENCE_RE = re.compile(r"^(`{3,}|~{3,}).*?^\1", re.M | re.S)
+
+# Read buffer for markdown files (whole typical file in one read)
+READ_BUFFER_SIZE = 1 << 20
+
 
 # ---------------------------------------------------
 # HELPERS
@@ -42,72 +50,148 @@ MIN_CONTENT_LENGTH = 200  # skip tiny markdown files
 def should_ignore(path: Path) -> bool:
     """
     Ignore non-documentation folders.
+
+    Only needed for Path.glob results; the scandir walker never descends
+    into IGNORED_DIRS.
     """
-    for part in path.parts:
-        if part in IGNORED_DIRS:
-            return True
-    return False
+    return not IGNORED_DIRS.isdisjoint(path.parts)
 
 
-def load_markdown_files(base_path: str) -> List[Document]:
+def load_markdown_file(md_file: Union[str, Path]) -> List[Document]:
     """
-    Load markdown files recursively with filtering.
+    Load a single markdown file, skipping it if it is too short.
     """
-    documents = []
+    path = str(md_file)
 
-    for md_file in Path(base_path).rglob("*.md"):
-        if should_ignore(md_file):
-            continue
+    # One buffered read, decoded once
+    with open(path, "rb", buffering=READ_BUFFER_SIZE) as f:
+        content = f.read().decode("utf-8")
 
-        loader = TextLoader(str(md_file), encoding="utf-8")
-        docs = loader.load()
+    if len(content) < MIN_CONTENT_LENGTH:
+        return []
 
-        for doc in docs:
-            if len(doc.page_content) < MIN_CONTENT_LENGTH:
-                continue
+    return [Document(
+        page_content=content,
+        metadata={
+            "source": "docs",
+            "file": os.path.basename(path),
+            "path": path,
+            "topic": os.path.basename(os.path.dirname(path)),
+        }
+    )]
 
-            doc.metadata = {
-                "source": "docs",
-                "file": md_file.name,
-                "path": str(md_file),
-                "topic": md_file.parent.name,
-            }
 
-            documents.append(doc)
+def _walk_md(base_path: str) -> Iterator[Tuple[str, int]]:
+    """
+    Walk a directory with os.scandir, yielding (path, size) of markdown files
+    outside IGNORED_DIRS.
+    """
+    stack = [base_path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(entry.path)
+                elif entry.name.endswith(".md") and entry.is_file():
+                    yield entry.path, entry.stat().st_size
+
+
+def iter_markdown_paths(base_path: str, glob_pattern: str = "**/*.md") -> Iterator[str]:
+    """
+    Yield markdown files worth loading.
+
+    Files whose byte size is already below MIN_CONTENT_LENGTH are skipped
+    without opening them (UTF-8 never has fewer bytes than characters).
+    The default pattern uses the scandir walker, whose sizes come from the
+    directory scan; other patterns use Path.glob plus one stat per file.
+    """
+    if glob_pattern != "**/*.md":
+        for md_file in Path(base_path).glob(glob_pattern):
+            if not should_ignore(md_file) and md_file.stat().st_size >= MIN_CONTENT_LENGTH:
+                yield str(md_file)
+        return
 
-    return documents
+    for path, size in _walk_md(base_path):
+        if size >= MIN_CONTENT_LENGTH:
+            yield path
 
 
-def split_by_headers(documents: List[Document]) -> List[Document]:
+def iter_markdown_files(base_path: str, glob_pattern: str = "**/*.md") -> Iterator[Document]:
     """
-    Header-based semantic chunking with empty-chunk filtering.
+    Lazily load markdown files recursively with filtering.
     """
+    for path in iter_markdown_paths(base_path, glob_pattern):
+        yield from load_markdown_file(path)
+
 
-    headers_to_split_on = [
-        ("#", "title"),
-        ("##", "section"),
-        ("###", "subsection"),
-    ]
+def load_markdown_files(base_path: str, glob_pattern: str = "**/*.md") -> List[Document]:
+    """
+    Load markdown files recursively with filtering.
 
-    splitter = MarkdownHeaderTextSplitter(
-        headers_to_split_on=headers_to_split_on
-    )
+    Large trees are read and decoded in settings.ingest_workers spawned
+    processes (see ingestion_pool); smaller ones in-process.
+    """
+    paths = list(iter_markdown_paths(base_path, glob_pattern))
 
-    chunks: List[Document] = []
+    pool = ingestion_pool(len(paths))
+    if pool is None:
+        return list(chain.from_iterable(map(load_markdown_file, paths)))
 
-    for doc in documents:
-        splits = splitter.split_text(doc.page_content)
+    with pool:
+        return list(chain.from_iterable(
+            pool.map(load_markdown_file, paths, chunksize=16)
+        ))
 
-        for chunk in splits:
-            # 🔥 CRITICAL FIX
-            if not chunk.page_content.strip():
-                continue
 
-            if len(chunk.page_content.strip()) < 50:
+def _fenced_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) offsets of fenced code blocks, whose "#" lines are not headers.
+    """
+    return [match.span() for match in _FENCE_RE.finditer(text)]
+
+
+def split_by_headers(documents: List[Document]) -> List[Document]:
+    """
+    Header-based semantic chunking with empty-chunk filtering.
+
+    Headers are located with one pre-compiled regex pass per document and
+    the text between them is sliced out directly. Each chunk carries the
+    enclosing title/section/subsection, as MarkdownHeaderTextSplitter did.
+    """
+    chunks: List[Document] = []
+
+    for doc in documents:
+        text = doc.page_content
+        fences = _fenced_spans(text)
+        matches = [
+            match for match in _HDR_RE.finditer(text)
+            if not any(start <= match.start() < end for start, end in fences)
+        ]
+
+        # Text before the first header, then each header's body
+        bounds = [(0, matches[0].start() if matches else len(text), None)]
+        for i, match in enumerate(matches):
+            body_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            bounds.append((match.end(), body_end, match))
+
+        headers = {}
+        for body_start, body_end, match in bounds:
+            if match is not None:
+                level = len(match.group(1))
+                # A header closes every deeper header
+                for deeper in _HEADER_KEYS[level - 1:]:
+                    headers.pop(deeper, None)
+                headers[_HEADER_KEYS[level - 1]] = match.group(2).strip()
+
+            body = text[body_start:body_end].strip()
+            if len(body) < 50:
                 continue
 
-            chunk.metadata.update(doc.metadata)
-            chunks.append(chunk)
+            chunks.append(Document(
+                page_content=body,
+                metadata={**headers, **doc.metadata}
+            ))
 
     return chunks
 
@@ -115,27 +199,158 @@ def split_by_headers(documents: List[Document]) -> List[Document]:
 # INGESTION PIPELINE
 # ---------------------------------------------------
 
-def ingest_docs():
+class DocsIngestionPipeline:
+    """
+    Ingestion pipeline for markdown documentation.
+    Splits files on headers and embeds chunks in micro-batches.
+    """
+    
+    def __init__(
+        self,
+        vector_store: Optional[DocsVectorStore] = None,
+        batch_size: int = 64,
+        max_batch_tokens: int = 8000,
+        embed_workers: int = 4,
+        chunk_cache: Optional[ChunkCache] = None
+    ):
+        """
+        Initialize the docs ingestion pipeline.
+        
+        Args:
+            vector_store: DocsVectorStore instance (creates new if None)
+            batch_size: Number of chunks embedded per API request
+            max_batch_tokens: Estimated token budget per API request
+            embed_workers: Number of concurrent embedding threads
+            chunk_cache: Hashes of chunks already ingested, used to skip
+                unchanged chunks on re-runs (one in the store's directory if None)
+        """
+        self.vector_store = vector_store or DocsVectorStore()
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.embed_workers = embed_workers
+        self.chunk_cache = chunk_cache or ChunkCache(self.vector_store.chunk_cache_path)
+    
+    def load_directory(
+        self,
+        directory_path: str,
+        glob_pattern: str = "**/*.md",
+        doc_type: str = "guide"
+    ) -> List[Document]:
+        """
+        Load all markdown files from a directory.
+        
+        Args:
+            directory_path: Path to docs directory
+            glob_pattern: File pattern to match
+            doc_type: Documentation type stored on every chunk
+            
+        Returns:
+            List of loaded documents
+        """
+        documents = load_markdown_files(directory_path, glob_pattern)
+        
+        for doc in documents:
+            doc.metadata["doc_type"] = doc_type
+        
+        return documents
+    
+    def chunk_file(self, file_path: str, doc_type: str = "guide") -> List[Document]:
+        """
+        Load and split a single markdown file.
+        
+        Args:
+            file_path: Path to the markdown file
+            doc_type: Documentation type stored on every chunk
+            
+        Returns:
+            Header-split documentation chunks
+        """
+        documents = load_markdown_file(file_path)
+        
+        for doc in documents:
+            doc.metadata["doc_type"] = doc_type
+        
+        return split_by_headers(documents)
+    
+    def iter_chunks(
+        self,
+        directory_path: str,
+        glob_pattern: str = "**/*.md",
+        doc_type: str = "guide"
+    ) -> Iterator[Document]:
+        """
+        Lazily load and split markdown files one at a time.
+        
+        Args:
+            directory_path: Path to docs directory
+            glob_pattern: File pattern to match
+            doc_type: Documentation type stored on every chunk
+            
+        Yields:
+            Header-split documentation chunks
+        """
+        for doc in iter_markdown_files(directory_path, glob_pattern):
+            doc.metadata["doc_type"] = doc_type
+            yield from split_by_headers([doc])
+    
+    def ingest_directory(
+        self,
+        directory_path: str,
+        glob_pattern: str = "**/*.md",
+        doc_type: str = "guide"
+    ) -> List[str]:
+        """
+        Complete ingestion pipeline for a docs directory.
+        
+        Args:
+            directory_path: Path to docs directory
+            glob_pattern: File pattern to match
+            doc_type: Documentation type stored on every chunk
+            
+        Returns:
+            List of document IDs
+        """
+        # Stream chunks into the store so memory stays bounded
+        chunks = self.iter_chunks(directory_path, glob_pattern, doc_type)
+        doc_ids = self._persist(chunks)
+        
+        print(f"✓ Ingested {len(doc_ids)} doc chunks from {directory_path}")
+        return doc_ids
+    
+    def _persist(self, documents: Iterable[Document]) -> List[str]:
+        """
+        Stream new or changed documents through concurrent embedding into the store.
+        
+        Args:
+            documents: Documents to embed and store (may be a lazy iterator)
+            
+        Returns:
+            List of document IDs
+        """
+        # Unchanged chunks from earlier runs are skipped before embedding
+        namespace = self.vector_store.chunk_namespace
+        if self.vector_store.get_collection_stats()["count"] == 0:
+            # The hashes outlived the data (store wiped or recreated)
+            self.chunk_cache.clear(namespace)
+        # FAISS keeps writes in memory: hashes are recorded after save()
+        save_fn = None if self.vector_store.persists_writes else self.vector_store.save
+        with self.chunk_cache.marking(self.vector_store.add_documents, namespace, save_fn) as write_fn:
+            return stream_ingest(
+                self.chunk_cache.filter_new(documents, namespace),
+                embed_fn=self.vector_store.embeddings.embed_documents,
+                write_fn=write_fn,
+                batch_size=self.batch_size,
+                max_tokens=self.max_batch_tokens,
+                n_workers=self.embed_workers,
+            )
+
+
+def ingest_docs() -> List[str]:
+    """
+    Ingest DOCS_PATH into the docs store the workflow queries.
+    """
     print("📘 Loading FastAPI documentation...")
-
-    raw_docs = load_markdown_files(DOCS_PATH)
-    print(f"✅ Loaded {len(raw_docs)} documentation files")
-
-    print("✂️  Splitting docs by markdown headers...")
-    chunks = split_by_headers(raw_docs)
-    print(f"✅ Created {len(chunks)} semantic chunks")
-
-    print("🧠 Storing embeddings in Docs Vector DB...")
-    vectordb = get_docs_vectorstore()
-
-    if not chunks:
-        print("⚠️ No chunks to ingest. Exiting...")
-        return
-
-    vectordb.add_documents(chunks)
-    # vectordb.persist() # Auto-persisted in newer Chroma versions
-
-    print("🎉 Docs ingestion completed successfully")
+    return DocsIngestionPipeline().ingest_directory(DOCS_PATH)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,6 @@
 """Memory writer for learned insights."""
 
 from typing import Optional, List
-from langchain_core.documents import Document
 
 from knoroute.vectorstores import MemoryVectorStore
 
@@ -12,14 +11,20 @@ class MemoryWriter:
     Called after successful query completion to store knowledge.
     """
     
-    def __init__(self, vector_store: Optional[MemoryVectorStore] = None):
+    def __init__(
+        self,
+        vector_store: Optional[MemoryVectorStore] = None,
+        embedding_batch_size: int = 128
+    ):
         """
         Initialize the memory writer.
         
         Args:
             vector_store: MemoryVectorStore instance (creates new if None)
+            embedding_batch_size: Insights embedded per API request in bulk writes
         """
         self.vector_store = vector_store or MemoryVectorStore()
+        self.embedding_batch_size = embedding_batch_size
     
     def write_insight(
         self,
@@ -40,17 +45,13 @@ class MemoryWriter:
         Returns:
             Document ID if added, None if duplicate
         """
-        # Validate confidence
-        if not 0.0 <= confidence <= 1.0:
-            raise ValueError("Confidence must be between 0.0 and 1.0")
-        
-        # Add to memory store (handles duplicate checking internally)
-        doc_id = self.vector_store.add_insight(
-            insight=insight,
-            learned_from=learned_from,
-            confidence=confidence,
-            tags=tags
-        )
+        # Same path as bulk writes (see MemoryVectorStore.add_insights)
+        [doc_id] = self._write_insights([{
+            "insight": insight,
+            "learned_from": learned_from,
+            "confidence": confidence,
+            "tags": tags
+        }])
         
         if doc_id:
             print(f"✓ Stored insight in memory (confidence: {confidence:.2f})")
@@ -76,22 +77,34 @@ class MemoryWriter:
         Returns:
             List of document IDs (None for duplicates)
         """
-        doc_ids = []
+        if not insights:
+            return []
         
-        for insight_data in insights:
-            doc_id = self.write_insight(
-                insight=insight_data['insight'],
-                learned_from=insight_data['learned_from'],
-                confidence=insight_data.get('confidence', 0.8),
-                tags=insight_data.get('tags')
-            )
-            doc_ids.append(doc_id)
+        doc_ids = self._write_insights(insights)
         
         successful = sum(1 for id in doc_ids if id is not None)
         print(f"✓ Stored {successful}/{len(insights)} insights in memory")
         
         return doc_ids
     
+    def _write_insights(self, insights: List[dict]) -> List[Optional[str]]:
+        """
+        Validate insights, then deduplicate and store them with one upsert.
+        
+        Args:
+            insights: Insight dictionaries (see write_multiple_insights)
+            
+        Returns:
+            List of document IDs (None for duplicates)
+        """
+        for insight_data in insights:
+            if not 0.0 <= insight_data.get('confidence', 0.8) <= 1.0:
+                raise ValueError("Confidence must be between 0.0 and 1.0")
+        
+        # Same duplicate handling as MemoryVectorStore.add_insight: hash
+        # lookup, plus a vector check for insights stored without a hash
+        return self.vector_store.add_insights(insights, batch_size=self.embedding_batch_size)
+    
     def extract_and_write_from_answer(
         self,
         query: str,
@@ -114,17 +127,15 @@ class MemoryWriter:
         """
         # Simple heuristic: use first sentence as insight
         # In production, use an LLM to extract key insights
-        sentences = answer.split('.')
-        if sentences:
-            insight = sentences[0].strip() + '.'
-            
-            return self.write_insight(
-                insight=insight,
-                learned_from=query,
-                confidence=confidence
-            )
+        # partition stops at the first period instead of splitting the whole answer
+        first_sentence, _, _ = answer.partition('.')
+        insight = first_sentence.strip() + '.'
         
-        return None
+        return self.write_insight(
+            insight=insight,
+            learned_from=query,
+            confidence=confidence
+        )
 
 
 # Example usage
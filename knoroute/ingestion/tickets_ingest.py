@@ -2,12 +2,69 @@
 
 import json
 import csv
+import sys
+import ijson
+from itertools import islice
+from types import MappingProxyType
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Iterable, Iterator, List, Mapping, Optional, Dict, Any
 from datetime import datetime
 from langchain_core.documents import Document
 
 from knoroute.vectorstores import TicketsVectorStore
+from knoroute.ingestion._streaming import stream_ingest
+from knoroute.ingestion._hash_cache import ChunkCache
+
+
+# Label keywords per severity, most severe first
+_SEVERITY_KEYWORDS = (
+    ("critical", ("critical", "urgent")),
+    ("high", ("high",)),
+    ("low", ("low",)),
+)
+
+
+def _intern(value: Any) -> Any:
+    """
+    Intern a metadata string so tickets share one copy of repeated values.
+    
+    Status and severity take a handful of distinct values across a whole
+    export; interning keeps a single string object per value.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# Shared default for absent nested Jira objects (no {} allocated per ticket)
+_NO_FIELD: Mapping[str, Any] = MappingProxyType({})
+
+# Jira priority name -> interned lowercase severity, filled as names are seen
+_JIRA_SEVERITY: Dict[str, str] = {}
+
+
+def _jira_metadata(issue: Dict[str, Any], fields: Dict[str, Any], now: str) -> Dict[str, Any]:
+    """
+    Build a Jira ticket's metadata with one lookup per nested field.
+    
+    Args:
+        issue: Raw Jira issue
+        fields: The issue's ``fields`` object (or the issue itself)
+        now: Timestamp used when the issue has no creation date
+        
+    Returns:
+        Ticket metadata
+    """
+    ticket_id = issue['key'] if 'key' in issue else issue.get('id', '')
+    priority = fields.get('priority', _NO_FIELD).get('name', 'medium')
+    severity = _JIRA_SEVERITY.get(priority)
+    if severity is None:
+        severity = _JIRA_SEVERITY[priority] = _intern(priority.lower())
+    
+    return {
+        "ticket_id": ticket_id,
+        "status": _intern(fields.get('status', _NO_FIELD).get('name', 'open')),
+        "severity": severity,
+        "created_at": fields.get('created') or now,
+    }
 
 
 class TicketsIngestionPipeline:
@@ -16,14 +73,30 @@ class TicketsIngestionPipeline:
     Supports JSON and CSV formats from Jira, GitHub Issues, etc.
     """
     
-    def __init__(self, vector_store: Optional[TicketsVectorStore] = None):
+    def __init__(
+        self,
+        vector_store: Optional[TicketsVectorStore] = None,
+        batch_size: int = 64,
+        max_batch_tokens: int = 8000,
+        embed_workers: int = 4,
+        chunk_cache: Optional[ChunkCache] = None
+    ):
         """
         Initialize the tickets ingestion pipeline.
         
         Args:
             vector_store: TicketsVectorStore instance (creates new if None)
+            batch_size: Number of tickets embedded per API request
+            max_batch_tokens: Estimated token budget per API request
+            embed_workers: Number of concurrent embedding threads
+            chunk_cache: Hashes of chunks already ingested, used to skip
+                unchanged chunks on re-runs (one in the store's directory if None)
         """
         self.vector_store = vector_store or TicketsVectorStore()
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.embed_workers = embed_workers
+        self.chunk_cache = chunk_cache or ChunkCache(self.vector_store.chunk_cache_path)
     
     def load_json_file(self, file_path: str) -> List[Dict[str, Any]]:
         """
@@ -49,14 +122,33 @@ class TicketsIngestionPipeline:
         Returns:
             List of ticket dictionaries
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        return list(self.iter_json_file(file_path))
+    
+    def iter_json_file(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream tickets from a JSON file one object at a time.
         
-        # Handle both single object and array
-        if isinstance(data, dict):
-            data = [data]
+        Arrays are parsed incrementally with ijson, so memory stays
+        proportional to a single ticket rather than the whole export.
         
-        return data
+        Args:
+            file_path: Path to JSON file
+            
+        Yields:
+            Ticket dictionaries
+        """
+        with open(file_path, 'rb') as f:
+            # Peek at the first significant byte to tell an array from a single object
+            first = f.read(1)
+            while first and first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            
+            # Handle both single object and array
+            if first == b'{':
+                yield json.load(f)
+            else:
+                yield from ijson.items(f, 'item', use_float=True)
     
     def load_csv_file(self, file_path: str) -> List[Dict[str, Any]]:
         """
@@ -70,57 +162,62 @@ class TicketsIngestionPipeline:
         Returns:
             List of ticket dictionaries
         """
-        tickets = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                tickets.append(row)
+        return list(self.iter_csv_file(file_path))
+    
+    def iter_csv_file(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream tickets from a CSV file one row at a time.
         
-        return tickets
+        Args:
+            file_path: Path to CSV file
+            
+        Yields:
+            Ticket dictionaries
+        """
+        with open(file_path, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            yield from csv.DictReader(f)
+    
+    @staticmethod
+    def _format_comments(comments: Any) -> str:
+        """Render a comment or list of comments as a trailing "Comments:" block."""
+        if not isinstance(comments, list):
+            comments = [comments]
+        return "\n\nComments:" + "".join([f"\n- {comment}" for comment in comments])
     
     def parse_github_issues(self, issues: List[Dict[str, Any]]) -> List[Document]:
         """
         Parse GitHub Issues format.
         
+        Fields are extracted column by column and each content string is
+        built with a single concatenation, rather than growing a parts list
+        per issue.
+        
         Args:
             issues: List of GitHub issue dictionaries
             
         Returns:
             List of Document objects
         """
-        documents = []
-        
-        for issue in issues:
-            # Combine title, body, and comments
-            content_parts = [
-                f"Title: {issue.get('title', '')}",
-                f"\nDescription: {issue.get('body', '')}",
-            ]
-            
-            # Add comments if available
-            if 'comments' in issue and issue['comments']:
-                content_parts.append("\nComments:")
-                if isinstance(issue['comments'], list):
-                    for comment in issue['comments']:
-                        content_parts.append(f"- {comment}")
-                else:
-                    content_parts.append(f"- {issue['comments']}")
-            
-            content = "\n".join(content_parts)
-            
-            # Extract metadata
-            metadata = {
-                "ticket_id": str(issue.get('number', issue.get('id', ''))),
-                "status": issue.get('state', 'open'),
-                "severity": self._infer_severity(issue),
-                "created_at": issue.get('created_at', datetime.now().isoformat()),
-            }
-            
-            doc = Document(page_content=content, metadata=metadata)
-            documents.append(doc)
+        now = datetime.now().isoformat()
+        titles = [f"{issue.get('title', '')}" for issue in issues]
+        bodies = [f"{issue.get('body', '')}" for issue in issues]
+        comments = [
+            self._format_comments(issue['comments']) if issue.get('comments') else ""
+            for issue in issues
+        ]
         
-        return documents
+        return [
+            Document(
+                page_content="Title: " + title + "\n\nDescription: " + body + comment_block,
+                metadata={
+                    "ticket_id": str(issue.get('number', issue.get('id', ''))),
+                    "status": _intern(issue.get('state', 'open')),
+                    "severity": _intern(self._infer_severity(issue)),
+                    "created_at": issue.get('created_at') or now,
+                }
+            )
+            for issue, title, body, comment_block in zip(issues, titles, bodies, comments)
+        ]
     
     def parse_jira_issues(self, issues: List[Dict[str, Any]]) -> List[Document]:
         """
@@ -132,38 +229,26 @@ class TicketsIngestionPipeline:
         Returns:
             List of Document objects
         """
-        documents = []
+        now = datetime.now().isoformat()
         
-        for issue in issues:
-            # Handle Jira's nested structure
-            fields = issue.get('fields', issue)
-            
-            # Combine summary and description
-            content_parts = [
-                f"Title: {fields.get('summary', '')}",
-                f"\nDescription: {fields.get('description', '')}",
-            ]
-            
-            # Add comments if available
-            if 'comment' in fields and 'comments' in fields['comment']:
-                content_parts.append("\nComments:")
-                for comment in fields['comment']['comments']:
-                    content_parts.append(f"- {comment.get('body', '')}")
-            
-            content = "\n".join(content_parts)
-            
-            # Extract metadata
-            metadata = {
-                "ticket_id": issue.get('key', issue.get('id', '')),
-                "status": fields.get('status', {}).get('name', 'open'),
-                "severity": fields.get('priority', {}).get('name', 'medium').lower(),
-                "created_at": fields.get('created', datetime.now().isoformat()),
-            }
-            
-            doc = Document(page_content=content, metadata=metadata)
-            documents.append(doc)
+        # Handle Jira's nested structure
+        fields = [issue.get('fields', issue) for issue in issues]
+        titles = [f"{f.get('summary', '')}" for f in fields]
+        descriptions = [f"{f.get('description', '')}" for f in fields]
+        comments = [
+            self._format_comments([c.get('body', '') for c in f['comment']['comments']])
+            if 'comment' in f and 'comments' in f['comment'] else ""
+            for f in fields
+        ]
         
-        return documents
+        return [
+            Document(
+                page_content="Title: " + title + "\n\nDescription: " + description + comment_block,
+                metadata=_jira_metadata(issue, f, now)
+            )
+            for issue, f, title, description, comment_block
+            in zip(issues, fields, titles, descriptions, comments)
+        ]
     
     def parse_generic_tickets(self, tickets: List[Dict[str, Any]]) -> List[Document]:
         """
@@ -175,41 +260,27 @@ class TicketsIngestionPipeline:
         Returns:
             List of Document objects
         """
-        documents = []
+        now = datetime.now().isoformat()
         
-        for ticket in tickets:
-            # Combine available fields
-            content_parts = []
-            
-            if 'title' in ticket:
-                content_parts.append(f"Title: {ticket['title']}")
-            
-            if 'description' in ticket:
-                content_parts.append(f"\nDescription: {ticket['description']}")
-            
-            if 'comments' in ticket:
-                content_parts.append("\nComments:")
-                comments = ticket['comments']
-                if isinstance(comments, list):
-                    for comment in comments:
-                        content_parts.append(f"- {comment}")
-                else:
-                    content_parts.append(f"- {comments}")
-            
-            content = "\n".join(content_parts)
-            
-            # Extract metadata
-            metadata = {
-                "ticket_id": str(ticket.get('id', ticket.get('ticket_id', ''))),
-                "status": ticket.get('status', 'open'),
-                "severity": ticket.get('severity', ticket.get('priority', 'medium')).lower(),
-                "created_at": ticket.get('created_at', datetime.now().isoformat()),
-            }
-            
-            doc = Document(page_content=content, metadata=metadata)
-            documents.append(doc)
+        # Only the fields a ticket actually has make it into its content
+        titles = [f"Title: {t['title']}" if 'title' in t else "" for t in tickets]
+        descriptions = [f"\nDescription: {t['description']}" if 'description' in t else "" for t in tickets]
+        # Parts are joined with "\n", so the block drops its leading newline
+        comments = [self._format_comments(t['comments'])[1:] if 'comments' in t else "" for t in tickets]
         
-        return documents
+        return [
+            Document(
+                page_content="\n".join([part for part in (title, description, comment_block) if part]),
+                metadata={
+                    "ticket_id": str(ticket.get('id', ticket.get('ticket_id', ''))),
+                    "status": _intern(ticket.get('status', 'open')),
+                    "severity": _intern(ticket.get('severity', ticket.get('priority', 'medium')).lower()),
+                    "created_at": ticket.get('created_at') or now,
+                }
+            )
+            for ticket, title, description, comment_block
+            in zip(tickets, titles, descriptions, comments)
+        ]
     
     def ingest_json(
         self,
@@ -226,19 +297,22 @@ class TicketsIngestionPipeline:
         Returns:
             List of document IDs
         """
-        # Load tickets
-        tickets = self.load_json_file(file_path)
-        
         # Parse based on format
         if format_type == "github":
-            documents = self.parse_github_issues(tickets)
+            parse = self.parse_github_issues
         elif format_type == "jira":
-            documents = self.parse_jira_issues(tickets)
+            parse = self.parse_jira_issues
         else:
-            documents = self.parse_generic_tickets(tickets)
+            parse = self.parse_generic_tickets
         
-        # Add to vector store
-        doc_ids = self.vector_store.add_documents(documents)
+        # Stream tickets into the embedding pipeline, parsed in batches so
+        # peak memory is one batch rather than the whole export
+        documents = (
+            doc
+            for tickets in self._iter_batches(self.iter_json_file(file_path))
+            for doc in parse(tickets)
+        )
+        doc_ids = self._persist(documents)
         
         print(f"✓ Ingested {len(doc_ids)} tickets from {file_path}")
         return doc_ids
@@ -253,18 +327,92 @@ class TicketsIngestionPipeline:
         Returns:
             List of document IDs
         """
-        # Load tickets
-        tickets = self.load_csv_file(file_path)
-        
-        # Parse as generic format
-        documents = self.parse_generic_tickets(tickets)
-        
-        # Add to vector store
-        doc_ids = self.vector_store.add_documents(documents)
+        # Rows are streamed as lists and parsed in batches, so the whole
+        # file is never held in memory and no per-row dict is built
+        doc_ids = self._persist(self.iter_csv_documents(file_path))
         
         print(f"✓ Ingested {len(doc_ids)} tickets from {file_path}")
         return doc_ids
     
+    def iter_csv_documents(self, file_path: str, batch_size: int = 512) -> Iterator[Document]:
+        """
+        Stream a CSV export as Documents in the generic ticket format.
+        
+        Rows are read with ``csv.reader`` and fields are picked by column
+        index (resolved once from the header), skipping the per-row dict
+        that ``csv.DictReader`` + ``parse_generic_tickets`` would build.
+        Output matches ``parse_generic_tickets`` on the same rows.
+        
+        Args:
+            file_path: Path to CSV file
+            batch_size: Rows parsed per batch
+            
+        Yields:
+            Ticket Documents
+        """
+        with open(file_path, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            index = {name: i for i, name in enumerate(header)}
+            
+            def column(rows: List[List[str]], *names: str) -> Optional[List[str]]:
+                # First of ``names`` present in the header; short rows read as ""
+                for name in names:
+                    if name in index:
+                        i = index[name]
+                        return [row[i] if i < len(row) else "" for row in rows]
+                return None
+            
+            for rows in self._iter_batches(reader, batch_size):
+                now = datetime.now().isoformat()
+                count = len(rows)
+                
+                # Content parts exist per column, so the layout is fixed per file
+                parts = []
+                titles = column(rows, 'title')
+                if titles is not None:
+                    parts.append(["Title: " + v for v in titles])
+                descriptions = column(rows, 'description')
+                if descriptions is not None:
+                    parts.append(["\nDescription: " + v for v in descriptions])
+                comments = column(rows, 'comments')
+                if comments is not None:
+                    parts.append(["\nComments:\n- " + v for v in comments])
+                contents = ["\n".join(row_parts) for row_parts in zip(*parts)] if parts else [""] * count
+                
+                ids = column(rows, 'id', 'ticket_id') or [""] * count
+                statuses = column(rows, 'status') or ["open"] * count
+                severities = column(rows, 'severity', 'priority') or ["medium"] * count
+                created = column(rows, 'created_at') or [""] * count
+                
+                for content, ticket_id, status, severity, created_at in zip(
+                    contents, ids, statuses, severities, created
+                ):
+                    yield Document(
+                        page_content=content,
+                        metadata={
+                            "ticket_id": ticket_id,
+                            "status": _intern(status),
+                            "severity": _intern(severity.lower()),
+                            "created_at": created_at or now,
+                        }
+                    )
+    
+    @staticmethod
+    def _iter_batches(
+        items: Iterable[Any],
+        size: int = 512
+    ) -> Iterator[List[Any]]:
+        """Group a stream of tickets (or CSV rows) into lists of up to ``size``."""
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+    
     def _infer_severity(self, issue: Dict[str, Any]) -> str:
         """
         Infer severity from issue labels or priority.
@@ -277,15 +425,20 @@ class TicketsIngestionPipeline:
         """
         # Check labels
         labels = issue.get('labels', [])
-        if isinstance(labels, list):
-            label_names = [l.get('name', '').lower() if isinstance(l, dict) else str(l).lower() for l in labels]
+        if isinstance(labels, list) and labels:
+            # One pass over the labels, keeping the most severe match
+            best = len(_SEVERITY_KEYWORDS)
+            for label in labels:
+                name = label.get('name', '').lower() if isinstance(label, dict) else str(label).lower()
+                for rank in range(best):
+                    if any(keyword in name for keyword in _SEVERITY_KEYWORDS[rank][1]):
+                        best = rank
+                        break
+                if best == 0:
+                    break
             
-            if any('critical' in l or 'urgent' in l for l in label_names):
-                return 'critical'
-            elif any('high' in l for l in label_names):
-                return 'high'
-            elif any('low' in l for l in label_names):
-                return 'low'
+            if best < len(_SEVERITY_KEYWORDS):
+                return _SEVERITY_KEYWORDS[best][0]
         
         # Check priority field
         priority = issue.get('priority', '')
@@ -293,6 +446,33 @@ class TicketsIngestionPipeline:
             return priority.lower()
         
         return 'medium'
+    
+    def _persist(self, documents: Iterable[Document]) -> List[str]:
+        """
+        Stream new or changed documents through concurrent embedding into the store.
+        
+        Args:
+            documents: Documents to embed and store (may be a lazy iterator)
+            
+        Returns:
+            List of document IDs
+        """
+        # Unchanged chunks from earlier runs are skipped before embedding
+        namespace = self.vector_store.chunk_namespace
+        if self.vector_store.get_collection_stats()["count"] == 0:
+            # The hashes outlived the data (store wiped or recreated)
+            self.chunk_cache.clear(namespace)
+        # FAISS keeps writes in memory: hashes are recorded after save()
+        save_fn = None if self.vector_store.persists_writes else self.vector_store.save
+        with self.chunk_cache.marking(self.vector_store.add_documents, namespace, save_fn) as write_fn:
+            return stream_ingest(
+                self.chunk_cache.filter_new(documents, namespace),
+                embed_fn=self.vector_store.embeddings.embed_documents,
+                write_fn=write_fn,
+                batch_size=self.batch_size,
+                max_tokens=self.max_batch_tokens,
+                n_workers=self.embed_workers,
+            )
 
 
 # Example usage
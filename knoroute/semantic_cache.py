@@ -0,0 +1,117 @@
+"""Semantic cache: reuse results for paraphrased queries."""
+
+import functools
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from knoroute.config import settings
+
+
+class SemanticCache:
+    """
+    Maps (query embedding, exact context key) to a cached value.
+    
+    A lookup hits when an entry with the same context key has a query
+    embedding whose cosine similarity to the new query is at least
+    ``threshold``. The context key carries everything besides the query
+    that the cached value depends on (e.g. an evidence fingerprint).
+    Entries older than ``ttl`` seconds (if set) are treated as misses.
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        threshold: Optional[float] = None,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            embeddings: Embeddings client used for query vectors
+            threshold: Minimum cosine similarity for a hit (defaults to settings)
+            max_entries: Oldest entries are evicted beyond this size
+            ttl: Seconds an entry stays valid (None keeps it until evicted)
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold if threshold is not None else settings.semantic_cache_threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        
+        self._entries: Dict[str, Tuple[List[np.ndarray], List[Any], List[float]]] = {}
+        self._order: deque = deque()
+        self._lock = threading.RLock()
+        
+        # lookup() followed by add() for the same query embeds only once
+        self._embed = functools.lru_cache(maxsize=256)(self._embed_query)
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def lookup(self, query: str, context_key: str = "") -> Optional[Any]:
+        """
+        Return the cached value for a similar query, or None.
+        
+        Args:
+            query: Query text
+            context_key: Exact-match part of the key
+            
+        Returns:
+            Cached value or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(context_key)
+            if not entry:
+                return None
+            vectors, values, added = list(entry[0]), list(entry[1]), list(entry[2])
+        
+        scores = np.stack(vectors) @ self._embed(query)
+        if self.ttl is not None:
+            expired = np.asarray(added) < time.monotonic() - self.ttl
+            scores[expired] = -np.inf
+        
+        best = int(np.argmax(scores))
+        if scores[best] >= self.threshold:
+            return values[best]
+        return None
+    
+    def add(self, query: str, context_key: str, value: Any):
+        """
+        Store a value for a query.
+        
+        Args:
+            query: Query text
+            context_key: Exact-match part of the key
+            value: Value to cache
+        """
+        vector = self._embed(query)
+        
+        with self._lock:
+            vectors, values, added = self._entries.setdefault(context_key, ([], [], []))
+            vectors.append(vector)
+            values.append(value)
+            added.append(time.monotonic())
+            self._order.append(context_key)
+            
+            while len(self._order) > self.max_entries:
+                oldest = self._order.popleft()
+                old_vectors, old_values, old_added = self._entries[oldest]
+                del old_vectors[0]
+                del old_values[0]
+                del old_added[0]
+                if not old_values:
+                    del self._entries[oldest]
+    
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._order.clear()
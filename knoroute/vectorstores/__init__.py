@@ -1,13 +1,41 @@
 """Vector stores package."""
 
-from .docs_db import get_docs_vectorstore
-from .code_db import CodeVectorStore
-from .tickets_db import TicketsVectorStore
-from .memory_db import MemoryVectorStore
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .docs_db import get_docs_vectorstore, DocsVectorStore
+    from .code_db import CodeVectorStore
+    from .tickets_db import TicketsVectorStore
+    from .memory_db import MemoryVectorStore
+
+# Stores pull in Chroma and the embedding backends: each is imported on
+# first access (PEP 562) so using one store doesn't load the others
+_LAZY_IMPORTS = {
+    "get_docs_vectorstore": ".docs_db",
+    "DocsVectorStore": ".docs_db",
+    "CodeVectorStore": ".code_db",
+    "TicketsVectorStore": ".tickets_db",
+    "MemoryVectorStore": ".memory_db",
+}
 
 __all__ = [
     "get_docs_vectorstore",
+    "DocsVectorStore",
     "CodeVectorStore",
     "TicketsVectorStore",
     "MemoryVectorStore",
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
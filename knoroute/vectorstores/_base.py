@@ -0,0 +1,409 @@
+"""Shared implementation of the Chroma-backed vector stores."""
+
+import uuid
+from functools import cached_property, lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain.retrievers.contextual_compression import ContextualCompressionRetriever
+from langchain.retrievers.document_compressors import LLMChainExtractor
+import chromadb
+
+from knoroute._clients import get_chat_llm, get_embeddings
+from knoroute.config import settings
+from knoroute.vectorstores._search_cache import SearchCache
+
+
+def _get_client(path: str):
+    """
+    Return the process-wide Chroma client for a persist directory.
+
+    PersistentClient is thread-safe, so every store (and every workflow)
+    opening the same directory shares one client and its SQLite handle,
+    however the path is spelled.
+    """
+    return _open_client(str(Path(path).resolve()))
+
+
+@lru_cache(maxsize=None)
+def _open_client(path: str):
+    return chromadb.PersistentClient(path=path)
+
+
+# Vectors are L2-normalized on write, so inner product ranks by cosine
+# without HNSW normalizing on every probe (set when a collection is created;
+# existing collections keep their space, and unit vectors rank the same under L2)
+_COLLECTION_METADATA = {"hnsw:space": "ip"}
+
+
+def _unit_vectors(embeddings: List[List[float]]) -> List[List[float]]:
+    """Scale each vector to unit L2 norm (zero vectors are left as is)."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).tolist()
+
+
+@lru_cache(maxsize=1)
+def _get_compressor() -> LLMChainExtractor:
+    """Return the shared extractor for compressed retrievers (prompt and chain built once)."""
+    return LLMChainExtractor.from_llm(get_chat_llm(temperature=0))
+
+
+class _BaseVectorStore:
+    """
+    Chroma-backed store parametrized by its collection and metadata schema.
+    
+    Subclasses set the class attributes below and add their own
+    store-specific searches; everything else lives here.
+    """
+    
+    # Tag stamped on every batched search result (metadata["source_db"])
+    source_db: str = ""
+    # Chroma collection name
+    collection_name: str = ""
+    # Directory under settings.vector_store_path
+    subdir: str = ""
+    # Metadata keys every document must carry
+    required_metadata: Tuple[str, ...] = ()
+    # Defaults for optional metadata; callables are evaluated per batch
+    metadata_defaults: Dict[str, Any] = {}
+    
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        backend: Optional[Literal["chroma", "faiss"]] = None
+    ):
+        """
+        Initialize the vector store.
+        
+        Args:
+            persist_directory: Chroma directory (defaults under settings.vector_store_path)
+            embeddings: Embeddings client to use (shared client if None)
+            backend: "chroma" (HNSW) or "faiss" (exact IndexFlatIP, for
+                collections up to ~100K vectors); settings.vector_store_type if None
+        """
+        if persist_directory is None:
+            persist_directory = str(Path(settings.vector_store_path) / self.subdir)
+        
+        self.persist_directory = persist_directory
+        self.embeddings = embeddings or get_embeddings()
+        self.backend = backend or settings.vector_store_type
+        
+        # Chroma client shared by every store on this directory
+        self.client = None if self.backend == "faiss" else _get_client(persist_directory)
+        self.vectorstore = self._open_vectorstore()
+        
+        # Repeated identical queries are answered without re-embedding or
+        # searching; writes through any store on this collection invalidate it
+        self._search_cache = SearchCache(
+            (str(Path(persist_directory).resolve()), self.collection_name)
+        )
+        
+        # Retrievers by (k, use_compression); they hold no per-query state
+        self._retrievers: Dict[Tuple[int, bool], Any] = {}
+    
+    def _open_vectorstore(self) -> VectorStore:
+        """Open (or create) the LangChain vector store for this collection."""
+        if self.backend == "faiss":
+            # Imported here so faiss-cpu is only needed when selected
+            from knoroute.vectorstores._faiss_backend import FaissVectorStore
+            
+            return FaissVectorStore(
+                self.persist_directory, self.collection_name, self.embeddings
+            )
+        
+        return Chroma(
+            client=self.client,
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            collection_metadata=_COLLECTION_METADATA,
+        )
+    
+    def _apply_schema(self, documents: List[Document]):
+        """
+        Validate required metadata and fill in defaults.
+        
+        Callable defaults are evaluated once per call, and each document's
+        metadata is rebuilt with a single dict merge.
+        
+        Args:
+            documents: Documents about to be written
+        """
+        defaults = {
+            key: default() if callable(default) else default
+            for key, default in self.metadata_defaults.items()
+        }
+        
+        for doc in documents:
+            for key in self.required_metadata:
+                if key not in doc.metadata:
+                    raise ValueError(f"Document metadata must include '{key}'")
+            
+            doc.metadata = {**defaults, **doc.metadata}
+    
+    def _document_ids(self, documents: List[Document]) -> List[str]:
+        """Generate one ID per document."""
+        return [str(uuid.uuid4()) for _ in documents]
+    
+    def add_documents(
+        self,
+        documents: Iterable[Document],
+        embeddings: Optional[Iterable[List[float]]] = None
+    ) -> List[str]:
+        """
+        Add documents to the vector store.
+        
+        Documents are consumed in batches of ``settings.embedding_batch_size``
+        (validated, embedded and written one batch at a time), so a generator
+        is never materialized in full.
+        
+        Args:
+            documents: Documents carrying the store's metadata schema
+            embeddings: Precomputed vectors, one per document (embedded here
+                if None)
+        
+        Returns:
+            List of document IDs
+        """
+        documents = iter(documents)
+        vectors = iter(embeddings) if embeddings is not None else None
+        batch_size = settings.embedding_batch_size
+        ids = []
+        
+        try:
+            while True:
+                batch = list(islice(documents, batch_size))
+                if not batch:
+                    break
+                batch_vectors = list(islice(vectors, len(batch))) if vectors is not None else None
+                ids.extend(self._write_batch(batch, batch_vectors))
+        finally:
+            # Also after a partial write, so no stale results survive
+            self.invalidate_cache()
+        
+        return ids
+    
+    def _write_batch(
+        self,
+        documents: List[Document],
+        embeddings: Optional[List[List[float]]]
+    ) -> List[str]:
+        """Validate, embed (one request), normalize and upsert one batch."""
+        self._apply_schema(documents)
+        
+        texts = [doc.page_content for doc in documents]
+        if embeddings is None:
+            embeddings = self.embeddings.embed_documents(texts)
+        embeddings = _unit_vectors(embeddings)
+        
+        # Write the vectors directly so the batch isn't embedded again
+        ids = self._document_ids(documents)
+        self._collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=[doc.metadata for doc in documents],
+        )
+        return ids
+    
+    def get_retriever(self, k: int = None, use_compression: bool = False):
+        """
+        Get a retriever for the store.
+        
+        Retrievers are built once per ``(k, use_compression)`` and reused.
+        
+        Args:
+            k: Number of documents to retrieve
+            use_compression: Whether to use contextual compression
+        
+        Returns:
+            Retriever instance
+        """
+        if k is None:
+            k = settings.retrieval_top_k
+        
+        key = (k, use_compression)
+        retriever = self._retrievers.get(key)
+        if retriever is not None:
+            return retriever
+        
+        retriever = self.vectorstore.as_retriever(
+            search_kwargs={"k": k}
+        )
+        
+        if use_compression:
+            retriever = ContextualCompressionRetriever(
+                base_compressor=_get_compressor(),
+                base_retriever=retriever
+            )
+        
+        return self._retrievers.setdefault(key, retriever)
+    
+    def similarity_search(
+        self,
+        query: str,
+        k: int = None,
+        filter_dict: Optional[dict] = None
+    ) -> List[Document]:
+        """
+        Perform similarity search on the store.
+        
+        Args:
+            query: Search query
+            k: Number of results
+            filter_dict: Metadata filters (e.g., {"severity": "critical"})
+        
+        Returns:
+            List of relevant documents
+        """
+        if k is None:
+            k = settings.retrieval_top_k
+        
+        search_kwargs = {"k": k}
+        if filter_dict:
+            search_kwargs["filter"] = filter_dict
+        
+        return self._search_cache.get_or_search(
+            query, k, filter_dict,
+            lambda: self.vectorstore.similarity_search(query, **search_kwargs)
+        )
+    
+    def _metadata_only_search(self, where: dict, k: int) -> List[Document]:
+        """
+        Fetch up to ``k`` records matching a metadata filter, without a query.
+        
+        Uses Chroma's ``get`` so nothing is embedded.
+        
+        Args:
+            where: Chroma metadata filter
+            k: Maximum number of records
+        
+        Returns:
+            List of matching documents
+        """
+        result = self._collection.get(
+            where=where,
+            limit=k,
+            include=["documents", "metadatas"]
+        )
+        return [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(result["documents"], result["metadatas"])
+        ]
+    
+    def similarity_search_by_vectors(
+        self,
+        query_embeddings: List[List[float]],
+        k: int = None
+    ) -> List[List[Document]]:
+        """
+        Run several vector searches in a single Chroma query.
+        
+        Vectors searched before (and not invalidated by a write since) are
+        answered from the search cache; only the rest are queried.
+        
+        Args:
+            query_embeddings: Query vectors
+            k: Number of results per query
+        
+        Returns:
+            One list of documents per query vector
+        """
+        if k is None:
+            k = settings.retrieval_top_k
+        
+        def search(vectors: List[List[float]]) -> List[List[Document]]:
+            result = self._collection.query(
+                query_embeddings=vectors,
+                n_results=k,
+                include=["documents", "metadatas"]
+            )
+            return [
+                [
+                    Document(page_content=text, metadata={**(metadata or {}), "source_db": self.source_db})
+                    for text, metadata in zip(texts, metadatas)
+                ]
+                for texts, metadatas in zip(result["documents"], result["metadatas"])
+            ]
+        
+        return self._search_cache.get_or_search_vectors(query_embeddings, k, search)
+    
+    @cached_property
+    def _collection(self):
+        """Collection handle, looked up once and reused."""
+        if self.client is None:
+            return self.vectorstore._collection
+        return self.client.get_or_create_collection(
+            self.collection_name, metadata=_COLLECTION_METADATA
+        )
+    
+    def save(self):
+        """
+        Flush the FAISS index to disk.
+        
+        Also runs at interpreter exit; a no-op for Chroma, which persists
+        every write.
+        """
+        if self.client is None:
+            self.vectorstore.save()
+    
+    @property
+    def persists_writes(self) -> bool:
+        """Whether writes are on disk when they return (Chroma) or need ``save()`` (FAISS)."""
+        return self.client is not None
+    
+    @property
+    def chunk_namespace(self) -> str:
+        """Namespace of this store's hashes in the ingestion ChunkCache."""
+        return f"{self.persist_directory}:{self.source_db}"
+    
+    @property
+    def chunk_cache_path(self) -> str:
+        """ChunkCache file for this store, kept next to the data it describes."""
+        return str(Path(self.persist_directory) / "chunk_cache.sqlite")
+    
+    def delete_collection(self):
+        """
+        Delete the entire collection.
+        
+        Also forgets the store's ingested-chunk hashes in its ChunkCache,
+        so re-ingesting the same data writes it again.
+        """
+        # Imported here: ingestion depends on the vector stores
+        from knoroute.ingestion._hash_cache import ChunkCache
+        
+        if self.client is None:
+            self.vectorstore.delete_collection()
+        else:
+            self.client.delete_collection(self.collection_name)
+            # The wrapper (and retrievers built on it) hold the deleted handle
+            self.vectorstore = self._open_vectorstore()
+        self.__dict__.pop("_collection", None)
+        self._retrievers.clear()
+        ChunkCache(self.chunk_cache_path).clear(self.chunk_namespace)
+        self.invalidate_cache()
+    
+    def invalidate_cache(self):
+        """
+        Drop cached search results of every store on this collection.
+        
+        Called after every write; call it after writing to the collection
+        from another process.
+        """
+        self._search_cache.clear()
+    
+    def get_collection_stats(self) -> dict:
+        """Get statistics about the collection."""
+        collection = self._collection
+        return {
+            "name": collection.name,
+            "count": collection.count(),
+            "metadata": collection.metadata
+        }
@@ -0,0 +1,340 @@
+"""Exact FAISS IndexFlatIP backend, a drop-in alternative to Chroma for small collections."""
+
+import atexit
+import json
+import operator
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+def _ordered(op):
+    # Range operators never match a missing value
+    return lambda value, operand: value is not None and op(value, operand)
+
+
+_OPERATORS = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": _ordered(operator.gt),
+    "$gte": _ordered(operator.ge),
+    "$lt": _ordered(operator.lt),
+    "$lte": _ordered(operator.le),
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style ``where`` filter against one metadata dict."""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if not all(_OPERATORS[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def _normalize(vectors: Iterable[Iterable[float]]) -> np.ndarray:
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _FaissCollection:
+    """
+    In-memory FAISS index plus document store, exposing the subset of the
+    Chroma collection API the knoroute stores use (upsert, query, get, count).
+
+    Vectors are L2-normalized, so inner product is cosine similarity. The
+    index and documents are written to ``<name>.faiss`` / ``<name>.docs.json``
+    by ``save()``.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.name = name
+        self.metadata = {"backend": "faiss", "space": "ip"}
+        self._index_path = Path(directory) / f"{name}.faiss"
+        self._docs_path = Path(directory) / f"{name}.docs.json"
+        self._lock = threading.RLock()
+        self._index = None
+        self._next_label = 0
+        # FAISS label -> (id, text, metadata), and id -> label
+        self._rows: Dict[int, Tuple[str, str, Dict[str, Any]]] = {}
+        self._labels: Dict[str, int] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        import faiss
+
+        if not self._index_path.exists():
+            return
+        self._index = faiss.read_index(str(self._index_path))
+        with open(self._docs_path, encoding="utf-8") as f:
+            state = json.load(f)
+        self._next_label = state["next_label"]
+        for label, doc_id, text, metadata in state["rows"]:
+            self._rows[label] = (doc_id, text, metadata)
+            self._labels[doc_id] = label
+
+    def save(self):
+        """Write the index and documents to disk if anything changed."""
+        import faiss
+
+        with self._lock:
+            if not self._dirty or self._index is None:
+                return
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            faiss.write_index(self._index, str(self._index_path))
+            with open(self._docs_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "next_label": self._next_label,
+                    "rows": [[label, *row] for label, row in self._rows.items()],
+                }, f)
+            self._dirty = False
+
+    def delete(self):
+        """Drop every vector and remove the persisted files."""
+        with self._lock:
+            self._index = None
+            self._rows.clear()
+            self._labels.clear()
+            self._dirty = False
+            for path in (self._index_path, self._docs_path):
+                path.unlink(missing_ok=True)
+
+    def count(self) -> int:
+        return len(self._labels)
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        import faiss
+
+        # The last occurrence of a repeated ID wins, as in Chroma
+        latest = {doc_id: i for i, doc_id in enumerate(ids)}
+        positions = sorted(latest.values())
+        if not positions:
+            return
+        vectors = _normalize([embeddings[i] for i in positions])
+
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+
+            replaced = [self._labels[ids[i]] for i in positions if ids[i] in self._labels]
+            if replaced:
+                self._index.remove_ids(np.asarray(replaced, dtype=np.int64))
+                for label in replaced:
+                    del self._rows[label]
+
+            labels = np.arange(self._next_label, self._next_label + len(positions), dtype=np.int64)
+            self._next_label += len(positions)
+            self._index.add_with_ids(vectors, labels)
+
+            for label, i in zip(labels.tolist(), positions):
+                self._rows[label] = (ids[i], documents[i], dict(metadatas[i] or {}))
+                self._labels[ids[i]] = label
+            self._dirty = True
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+        with self._lock:
+            total = self._index.ntotal if self._index is not None else 0
+            if total == 0:
+                for key in result:
+                    result[key] = [[] for _ in query_embeddings]
+                return result
+
+            # Filtered searches rank everything and filter afterwards (exact)
+            k = total if where else min(n_results, total)
+            scores, labels = self._index.search(_normalize(query_embeddings), k)
+
+            for row_scores, row_labels in zip(scores, labels):
+                hits = []
+                for score, label in zip(row_scores.tolist(), row_labels.tolist()):
+                    if label < 0:
+                        continue
+                    doc_id, text, metadata = self._rows[label]
+                    if where and not _matches(metadata, where):
+                        continue
+                    hits.append((doc_id, text, metadata, 1.0 - score))
+                    if len(hits) == n_results:
+                        break
+                result["ids"].append([h[0] for h in hits])
+                result["documents"].append([h[1] for h in hits])
+                result["metadatas"].append([dict(h[2]) for h in hits])
+                result["distances"].append([h[3] for h in hits])
+
+        return result
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, List[Any]]:
+        result = {"ids": [], "documents": [], "metadatas": []}
+
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[self._labels[i]] for i in ids if i in self._labels]
+            else:
+                rows = list(self._rows.values())
+
+            for doc_id, text, metadata in rows:
+                if where and not _matches(metadata, where):
+                    continue
+                result["ids"].append(doc_id)
+                result["documents"].append(text)
+                result["metadatas"].append(dict(metadata))
+                if limit is not None and len(result["ids"]) >= limit:
+                    break
+
+        return result
+
+
+# One collection per index file, shared by every store opened on it, so
+# each is loaded and registered for saving at exit only once
+_collections: Dict[Path, _FaissCollection] = {}
+_collections_lock = threading.Lock()
+
+
+def _open_collection(directory: str, name: str) -> _FaissCollection:
+    """Return the process-wide collection for ``directory``/``name``."""
+    path = (Path(directory) / name).resolve()
+    with _collections_lock:
+        collection = _collections.get(path)
+        if collection is None:
+            collection = _FaissCollection(directory, name)
+            _collections[path] = collection
+            atexit.register(collection.save)
+        return collection
+
+
+class FaissVectorStore(VectorStore):
+    """
+    LangChain vector store over an exact ``faiss.IndexFlatIP``.
+
+    For collections up to ~100K vectors one BLAS matrix-vector product over
+    contiguous float32 data is faster than HNSW traversal, and the results
+    are exact. Requires ``faiss-cpu``. Changes are held in memory and written
+    by ``save()``; the ingestion pipelines call it when they finish, and it
+    also runs at interpreter exit.
+    """
+
+    def __init__(self, directory: str, collection_name: str, embedding_function: Embeddings):
+        """
+        Initialize the store, loading a previously saved index if present.
+
+        Args:
+            directory: Directory holding the index files
+            collection_name: File name prefix for this collection
+            embedding_function: Embeddings client
+        """
+        self._collection = _open_collection(directory, collection_name)
+        self._embedding_function = embedding_function
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        self._collection.upsert(
+            ids=ids,
+            embeddings=self._embedding_function.embed_documents(texts),
+            documents=texts,
+            metadatas=metadatas or [{} for _ in texts],
+        )
+        return ids
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        return self.similarity_search_by_vector(
+            self._embedding_function.embed_query(query),
+            k=k,
+            filter=filter
+        )
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        result = self._collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            where=filter
+        )
+        return [
+            Document(page_content=text, metadata=metadata)
+            for text, metadata in zip(result["documents"][0], result["metadatas"][0])
+        ]
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        directory: str,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> "FaissVectorStore":
+        store = cls(directory, collection_name, embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        store.save()
+        return store
+
+    def save(self):
+        """Write the index to disk if it changed."""
+        self._collection.save()
+
+    def delete_collection(self):
+        """Drop the collection and its files."""
+        self._collection.delete()
@@ -0,0 +1,155 @@
+"""In-process LRU cache of similarity search results."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+
+# Write generation per collection, shared by every store instance opened on
+# it, so a write through any instance invalidates all of their caches
+_generations: Dict[Hashable, int] = {}
+_generations_lock = threading.Lock()
+
+
+def _generation(scope: Hashable) -> int:
+    with _generations_lock:
+        return _generations.get(scope, 0)
+
+
+def _copy(results: List[Document]) -> List[Document]:
+    return [
+        Document(page_content=doc.page_content, metadata=dict(doc.metadata))
+        for doc in results
+    ]
+
+
+class SearchCache:
+    """
+    Bounded LRU map from a query (text or vector) to search results.
+
+    A repeated query skips the query embedding and the index lookup. Results
+    are tagged with the collection's write generation, which every store
+    instance on the same collection bumps on write or delete, so cached
+    results are never stale within the process. Callers get copies of the
+    cached documents and may mutate them freely.
+    """
+
+    def __init__(self, scope: Hashable, maxsize: int = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            scope: Identifies the collection (e.g. (persist path, collection name))
+            maxsize: Maximum number of cached queries
+        """
+        self.scope = scope
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, List[Document]]" = OrderedDict()
+        self._entries_generation = _generation(scope)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(query: str, k: int, filter_dict: Optional[dict]) -> Tuple[str, int, str]:
+        # Filters may nest operators ({"$and": [...]}), so serialize canonically
+        filter_key = json.dumps(filter_dict, sort_keys=True, default=str) if filter_dict else ""
+        return query, k, filter_key
+
+    @staticmethod
+    def _vector_key(vector: Sequence[float], k: int) -> Tuple[str, bytes, int]:
+        digest = hashlib.blake2b(np.asarray(vector, dtype=np.float32).tobytes(), digest_size=16)
+        return "vector", digest.digest(), k
+
+    def _lookup(self, keys: List[Hashable]) -> Tuple[List[Optional[List[Document]]], int]:
+        """Cached results per key (None on a miss) and the current generation."""
+        generation = _generation(self.scope)
+        with self._lock:
+            if generation != self._entries_generation:
+                self._entries.clear()
+                self._entries_generation = generation
+
+            hits = []
+            for key in keys:
+                results = self._entries.get(key)
+                if results is not None:
+                    self._entries.move_to_end(key)
+                hits.append(results)
+        return hits, generation
+
+    def _store(self, key: Hashable, results: List[Document], generation: int):
+        with self._lock:
+            # A write since the search started: the results may be stale
+            if generation != self._entries_generation or generation != _generation(self.scope):
+                return
+            self._entries[key] = results
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_search(
+        self,
+        query: str,
+        k: int,
+        filter_dict: Optional[dict],
+        search: Callable[[], List[Document]]
+    ) -> List[Document]:
+        """
+        Return cached results for the query, running ``search`` on a miss.
+
+        Args:
+            query: Search query
+            k: Number of results
+            filter_dict: Metadata filters
+            search: Zero-argument function performing the actual search
+
+        Returns:
+            List of documents
+        """
+        key = self._key(query, k, filter_dict)
+        (results,), generation = self._lookup([key])
+
+        if results is None:
+            results = search()
+            self._store(key, results, generation)
+
+        return _copy(results)
+
+    def get_or_search_vectors(
+        self,
+        vectors: List[Sequence[float]],
+        k: int,
+        search: Callable[[List[Sequence[float]]], List[List[Document]]]
+    ) -> List[List[Document]]:
+        """
+        Return cached results per query vector, searching the misses in one call.
+
+        Args:
+            vectors: Query vectors
+            k: Number of results per vector
+            search: Function mapping a list of vectors to one result list each
+
+        Returns:
+            One list of documents per vector
+        """
+        keys = [self._vector_key(vector, k) for vector in vectors]
+        results, generation = self._lookup(keys)
+
+        missing = [i for i, hit in enumerate(results) if hit is None]
+        if missing:
+            found = search([vectors[i] for i in missing])
+            for i, docs in zip(missing, found):
+                results[i] = docs
+                self._store(keys[i], docs, generation)
+
+        return [_copy(docs) for docs in results]
+
+    def clear(self):
+        """Invalidate cached results for every store instance on this collection."""
+        with _generations_lock:
+            _generations[self.scope] = _generations.get(self.scope, 0) + 1
+        with self._lock:
+            self._entries.clear()
@@ -1,30 +1,33 @@
 # vectorstores/docs_db.py
 
-import os
-from pathlib import Path
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+from functools import lru_cache
 
-from knoroute.config import settings
+from knoroute.vectorstores._base import _BaseVectorStore
 
 
-def get_docs_vectorstore() -> Chroma:
+class DocsVectorStore(_BaseVectorStore):
     """
-    Creates or loads the Docs vector database.
-    Stores FastAPI documentation embeddings.
+    Vector store for official documentation with metadata schema:
+    - doc_type: guide, reference, tutorial
+    - section: markdown section the chunk came from
+    - version: documentation version
     """
-
-    embedding = OpenAIEmbeddings(
-        model=settings.embedding_model,
-        openai_api_key=settings.openai_api_key
-    )
-
-    persist_directory = str(Path(settings.vector_store_path) / "docs_db")
-
-    vectordb = Chroma(
-        collection_name="fastapi_docs",
-        embedding_function=embedding,
-        persist_directory=persist_directory,
-    )
-
-    return vectordb
+    
+    source_db = "docs"
+    collection_name = "docs_collection"
+    subdir = "docs_db"
+    required_metadata = ("source",)
+    metadata_defaults = {
+        "doc_type": "guide",
+        "section": "",
+        "version": "",
+    }
+
+
+@lru_cache(maxsize=1)
+def get_docs_vectorstore() -> DocsVectorStore:
+    """
+    Return the docs store that ``ingest_docs`` writes and the workflow reads.
+    The instance is created once and shared by every caller.
+    """
+    return DocsVectorStore()
@@ -1,70 +1,105 @@
 """Memory/learned knowledge vector store."""
 
-from typing import List, Optional
+import hashlib
+import re
+from typing import Iterable, List, Literal, Optional, Set
 from datetime import datetime
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
-from langchain_openai import ChatOpenAI
-from langchain.retrievers.contextual_compression import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
-import chromadb
-from pathlib import Path
+from langchain_core.embeddings import Embeddings
 
+from knoroute._clients import get_local_embeddings
 from knoroute.config import settings
+from knoroute.vectorstores._base import _BaseVectorStore
 
 
-class MemoryVectorStore:
+def insight_hash(insight: str) -> str:
+    """
+    Hash an insight for exact-duplicate detection (surrounding whitespace ignored).
+    
+    Args:
+        insight: Insight text
+        
+    Returns:
+        SHA-256 hex digest
+    """
+    return hashlib.sha256(insight.strip().encode("utf-8")).hexdigest()
+
+
+class MemoryVectorStore(_BaseVectorStore):
     """
     Vector store for learned knowledge with metadata schema:
     - learned_from: query that generated insight
     - confidence: 0.0-1.0 score
     - created_at: timestamp
     - tags: categorization
+    - content_hash: insight_hash of the text, for duplicate lookups
     """
     
-    def __init__(self, persist_directory: Optional[str] = None):
-        """Initialize the memory vector store."""
-        if persist_directory is None:
-            persist_directory = str(Path(settings.vector_store_path) / "memory_db")
-        
-        self.persist_directory = persist_directory
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.embedding_model,
-            openai_api_key=settings.openai_api_key
-        )
+    source_db = "memory"
+    collection_name = "memory_collection"
+    subdir = "memory_db"
+    required_metadata = ("learned_from",)
+    metadata_defaults = {
+        "confidence": 0.8,
+        "created_at": lambda: datetime.now().isoformat(),
+        "tags": "",
+    }
+    
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        embeddings: Optional[Embeddings] = None,
+        backend: Optional[Literal["chroma", "faiss"]] = None
+    ):
+        """
+        Initialize the memory vector store.
         
-        # Initialize Chroma client
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        With ``settings.memory_local_embeddings`` and no explicit client,
+        insights are embedded locally with ``settings.local_embedding_model``
+        (384-D, no API calls) into a collection named after that model, since
+        its vectors can't share a collection with the default embeddings.
         
-        # Initialize vector store
-        self.vectorstore = Chroma(
-            client=self.client,
-            collection_name="memory_collection",
-            embedding_function=self.embeddings,
-        )
+        Args:
+            persist_directory: Chroma directory (defaults under settings.vector_store_path)
+            embeddings: Embeddings client to use (shared or local client if None)
+            backend: "chroma" or "faiss" (settings.vector_store_type if None)
+        """
+        if embeddings is None and settings.memory_local_embeddings:
+            embeddings = get_local_embeddings()
+            model = re.sub(r"[^A-Za-z0-9._-]", "-", settings.local_embedding_model.rsplit("/", 1)[-1])
+            self.collection_name = f"memory_collection_{model}"[:63]
+        
+        super().__init__(persist_directory, embeddings, backend)
+    
+    def _apply_schema(self, documents: List[Document]):
+        super()._apply_schema(documents)
+        
+        for doc in documents:
+            # Stored as a number so range filters ($gte) apply to it
+            doc.metadata["confidence"] = float(doc.metadata["confidence"])
+            doc.metadata.setdefault("content_hash", insight_hash(doc.page_content))
     
-    def add_documents(self, documents: List[Document]) -> List[str]:
+    def existing_hashes(self, hashes: Iterable[str]) -> Set[str]:
         """
-        Add memory documents to the vector store.
+        Return the subset of insight hashes already stored.
+        
+        A metadata lookup, so nothing is embedded.
         
         Args:
-            documents: List of Document objects with memory metadata
+            hashes: insight_hash values to check
             
         Returns:
-            List of document IDs
+            Set of hashes present in the store
         """
-        # Validate metadata schema
-        for doc in documents:
-            if "learned_from" not in doc.metadata:
-                raise ValueError("Document metadata must include 'learned_from'")
-            
-            # Set defaults for optional fields
-            doc.metadata.setdefault("confidence", 0.8)
-            doc.metadata.setdefault("created_at", datetime.now().isoformat())
-            doc.metadata.setdefault("tags", "")
+        hashes = list(set(hashes))
+        if not hashes:
+            return set()
         
-        return self.vectorstore.add_documents(documents)
+        result = self._collection.get(
+            where={"content_hash": {"$in": hashes}},
+            include=["metadatas"]
+        )
+        return {metadata["content_hash"] for metadata in result["metadatas"] if metadata}
     
     def add_insight(
         self,
@@ -83,84 +118,90 @@ class MemoryVectorStore:
             tags: Optional categorization tags
             
         Returns:
-            Document ID
-        """
-        # Check for duplicates
-        similar_docs = self.similarity_search(insight, k=1)
-        if similar_docs and similar_docs[0].page_content.strip() == insight.strip():
-            # Already exists, don't add duplicate
-            return None
-        
-        doc = Document(
-            page_content=insight,
-            metadata={
-                "learned_from": learned_from,
-                "confidence": confidence,
-                "created_at": datetime.now().isoformat(),
-                "tags": ",".join(tags) if tags else ""
-            }
-        )
-        
-        ids = self.add_documents([doc])
-        return ids[0] if ids else None
-    
-    def get_retriever(self, k: int = None, use_compression: bool = False):
-        """
-        Get a retriever for the memory store.
-        
-        Args:
-            k: Number of documents to retrieve
-            use_compression: Whether to use contextual compression
-            
-        Returns:
-            Retriever instance
+            Document ID (None if the insight already exists)
         """
-        if k is None:
-            k = settings.retrieval_top_k
-        
-        base_retriever = self.vectorstore.as_retriever(
-            search_kwargs={"k": k}
-        )
-        
-        if use_compression:
-            llm = ChatOpenAI(
-                model=settings.llm_model,
-                temperature=0,
-                openai_api_key=settings.openai_api_key
-            )
-            compressor = LLMChainExtractor.from_llm(llm)
-            return ContextualCompressionRetriever(
-                base_compressor=compressor,
-                base_retriever=base_retriever
-            )
-        
-        return base_retriever
+        [doc_id] = self.add_insights([{
+            "insight": insight,
+            "learned_from": learned_from,
+            "confidence": confidence,
+            "tags": tags
+        }])
+        return doc_id
     
-    def similarity_search(
+    def add_insights(
         self,
-        query: str,
-        k: int = None,
-        filter_dict: Optional[dict] = None
-    ) -> List[Document]:
+        insights: List[dict],
+        batch_size: Optional[int] = None
+    ) -> List[Optional[str]]:
         """
-        Perform similarity search on memory.
+        Add insights, skipping those already in memory.
+        
+        Duplicates are found by content_hash with one metadata lookup, so
+        only new insights are embedded. Insights stored before content_hash
+        existed are only found by vector: the new vectors drive one k=1
+        query for exact-text matches and are then written without being
+        embedded again.
         
         Args:
-            query: Search query
-            k: Number of results
-            filter_dict: Metadata filters
+            insights: Dicts with insight, learned_from and optional
+                confidence (default 0.8) and tags
+            batch_size: Insights embedded per request
+                (settings.embedding_batch_size if None)
             
         Returns:
-            List of relevant memory documents
+            One document ID per insight (None for duplicates)
         """
-        if k is None:
-            k = settings.retrieval_top_k
+        hashes = [insight_hash(insight_data["insight"]) for insight_data in insights]
+        existing = self.existing_hashes(hashes)
+        
+        doc_ids: List[Optional[str]] = [None] * len(insights)
+        positions = []
+        docs = []
+        
+        for i, (insight_data, content_hash) in enumerate(zip(insights, hashes)):
+            # Already in memory, or repeated earlier in this batch
+            if content_hash in existing:
+                continue
+            existing.add(content_hash)
+            
+            tags = insight_data.get("tags")
+            positions.append(i)
+            docs.append(Document(
+                page_content=insight_data["insight"],
+                metadata={
+                    "learned_from": insight_data["learned_from"],
+                    "confidence": insight_data.get("confidence", 0.8),
+                    "created_at": datetime.now().isoformat(),
+                    "tags": ",".join(tags) if tags else "",
+                    "content_hash": content_hash
+                }
+            ))
+        
+        if not docs:
+            return doc_ids
+        
+        texts = [doc.page_content for doc in docs]
+        batch_size = batch_size or settings.embedding_batch_size
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + batch_size]))
+        
+        # Drop exact duplicates among insights stored without a hash
+        nearest = self.similarity_search_by_vectors(vectors, k=1)
+        keep = [
+            j for j, (text, found) in enumerate(zip(texts, nearest))
+            if not (found and found[0].page_content.strip() == text.strip())
+        ]
         
-        search_kwargs = {"k": k}
-        if filter_dict:
-            search_kwargs["filter"] = filter_dict
+        if keep:
+            ids = self.add_documents(
+                [docs[j] for j in keep],
+                embeddings=[vectors[j] for j in keep]
+            )
+            for j, doc_id in zip(keep, ids):
+                doc_ids[positions[j]] = doc_id
         
-        return self.vectorstore.similarity_search(query, **search_kwargs)
+        return doc_ids
     
     def search_by_confidence(
         self,
@@ -177,24 +218,7 @@ class MemoryVectorStore:
         Returns:
             List of high-confidence memories
         """
-        # Note: Chroma doesn't support range queries in filters
-        # This is a workaround - retrieve more and filter in Python
-        all_docs = self.vectorstore.similarity_search("", k=k * 2)
-        filtered = [
-            doc for doc in all_docs
-            if float(doc.metadata.get("confidence", 0)) >= min_confidence
-        ]
-        return filtered[:k]
-    
-    def delete_collection(self):
-        """Delete the entire collection."""
-        self.client.delete_collection("memory_collection")
-    
-    def get_collection_stats(self) -> dict:
-        """Get statistics about the collection."""
-        collection = self.client.get_collection("memory_collection")
-        return {
-            "name": collection.name,
-            "count": collection.count(),
-            "metadata": collection.metadata
-        }
+        # The range filter runs inside Chroma and exactly k matches come back
+        return self._metadata_only_search(
+            {"confidence": {"$gte": float(min_confidence)}}, k
+        )
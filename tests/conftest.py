@@ -0,0 +1,7 @@
+"""Shared pytest setup."""
+
+import os
+
+# knoroute.config builds its settings at import and requires an API key;
+# no test talks to OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,25 @@
+"""Tests for the on-disk answer cache."""
+
+from knoroute._answer_cache import _AnswerCache
+
+
+def test_oldest_answers_are_evicted(tmp_path):
+    cache = _AnswerCache(str(tmp_path / "answers.sqlite"), max_entries=3)
+
+    for i in range(5):
+        cache.set(f"k{i}", f"v{i}")
+
+    assert [cache.get(f"k{i}") for i in range(5)] == [None, None, "v2", "v3", "v4"]
+
+
+def test_rewritten_answer_counts_as_newest(tmp_path):
+    cache = _AnswerCache(str(tmp_path / "answers.sqlite"), max_entries=2)
+
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("a", "3")
+    cache.set("c", "4")
+
+    assert cache.get("a") == "3"
+    assert cache.get("b") is None
+    assert cache.get("c") == "4"
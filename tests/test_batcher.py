@@ -0,0 +1,40 @@
+"""Tests for token-aware embedding batches."""
+
+from langchain_core.documents import Document
+
+from knoroute.ingestion._batcher import pack_by_tokens
+
+
+def _docs(*sizes):
+    return [Document(page_content="x" * size) for size in sizes]
+
+
+def _sizes(batches):
+    return [[len(doc.page_content) for doc in batch] for batch in batches]
+
+
+def test_empty_input_yields_no_batches():
+    assert list(pack_by_tokens([])) == []
+
+
+def test_oversized_item_is_a_batch_of_its_own():
+    # 4 characters per estimated token: 400 characters = 100 tokens
+    batches = list(pack_by_tokens(_docs(40, 400, 40), max_tokens=50))
+
+    assert _sizes(batches) == [[40], [400], [40]]
+
+
+def test_single_oversized_item():
+    assert _sizes(pack_by_tokens(_docs(400), max_tokens=50)) == [[400]]
+
+
+def test_small_items_share_a_batch_up_to_the_budget():
+    batches = list(pack_by_tokens(_docs(40, 40, 40, 40), max_tokens=25))
+
+    assert _sizes(batches) == [[40, 40], [40, 40]]
+
+
+def test_max_items_caps_batch_length():
+    batches = list(pack_by_tokens(_docs(4, 4, 4, 4, 4), max_tokens=1000, max_items=2))
+
+    assert _sizes(batches) == [[4, 4], [4, 4], [4]]
@@ -0,0 +1,41 @@
+"""Tests for header-based markdown chunking."""
+
+from langchain_core.documents import Document
+
+from knoroute.ingestion.docs_ingest import split_by_headers
+
+
+BODY = "This paragraph is long enough to be kept as a chunk of its own."
+
+
+def test_chunks_carry_enclosing_headers():
+    text = f"# Guide\n\n{BODY}\n\n## Setup\n\n{BODY}\n\n### Linux\n\n{BODY}\n\n## Usage\n\n{BODY}\n"
+    chunks = split_by_headers([Document(page_content=text, metadata={"source": "guide.md"})])
+
+    assert [chunk.metadata.get("section") for chunk in chunks] == [None, "Setup", "Setup", "Usage"]
+    assert chunks[2].metadata["subsection"] == "Linux"
+    # A new section closes the previous subsection
+    assert "subsection" not in chunks[3].metadata
+    assert all(chunk.metadata["title"] == "Guide" for chunk in chunks)
+    assert all(chunk.metadata["source"] == "guide.md" for chunk in chunks)
+
+
+def test_hash_lines_in_code_fences_are_not_headers():
+    text = (
+        f"# Install\n\n{BODY}\n\n"
+        "```bash\n# install the package\npip install knoroute\n```\n\n"
+        "~~~python\n## not a section either\nimport knoroute\n~~~\n\n"
+        f"## Configure\n\n{BODY}\n"
+    )
+    chunks = split_by_headers([Document(page_content=text)])
+
+    assert [chunk.metadata.get("section") for chunk in chunks] == [None, "Configure"]
+    assert "# install the package" in chunks[0].page_content
+    assert "## not a section either" in chunks[0].page_content
+
+
+def test_short_chunks_are_dropped():
+    text = f"# Title\n\ntoo short\n\n## Section\n\n{BODY}\n"
+    chunks = split_by_headers([Document(page_content=text)])
+
+    assert [chunk.page_content for chunk in chunks] == [BODY]
@@ -0,0 +1,49 @@
+"""Tests for the Chroma-style metadata filters of the FAISS backend."""
+
+from knoroute.vectorstores._faiss_backend import _matches
+
+
+METADATA = {"source_db": "tickets", "status": "open", "priority": 3, "component": "auth"}
+
+
+def test_plain_equality():
+    assert _matches(METADATA, {"status": "open"})
+    assert not _matches(METADATA, {"status": "closed"})
+    assert not _matches(METADATA, {"missing": "x"})
+
+
+def test_comparison_operators():
+    assert _matches(METADATA, {"priority": {"$gte": 3}})
+    assert _matches(METADATA, {"priority": {"$gt": 1, "$lt": 5}})
+    assert not _matches(METADATA, {"priority": {"$lt": 3}})
+    assert _matches(METADATA, {"status": {"$ne": "closed"}})
+    assert _matches(METADATA, {"status": {"$eq": "open"}})
+
+
+def test_range_operators_never_match_missing_values():
+    assert not _matches(METADATA, {"missing": {"$gt": 0}})
+    assert not _matches(METADATA, {"missing": {"$lte": 0}})
+
+
+def test_membership_operators():
+    assert _matches(METADATA, {"component": {"$in": ["auth", "billing"]}})
+    assert not _matches(METADATA, {"component": {"$nin": ["auth"]}})
+    assert _matches(METADATA, {"missing": {"$nin": ["auth"]}})
+
+
+def test_logical_operators_nest():
+    assert _matches(METADATA, {"$and": [{"status": "open"}, {"priority": {"$gte": 2}}]})
+    assert not _matches(METADATA, {"$and": [{"status": "open"}, {"priority": {"$gte": 4}}]})
+    assert _matches(METADATA, {"$or": [{"status": "closed"}, {"component": "auth"}]})
+    assert not _matches(METADATA, {"$or": [{"status": "closed"}, {"component": "ui"}]})
+    assert _matches(METADATA, {
+        "$or": [
+            {"$and": [{"status": "closed"}, {"priority": 3}]},
+            {"$and": [{"status": "open"}, {"component": {"$in": ["auth"]}}]},
+        ]
+    })
+
+
+def test_empty_filter_matches_everything():
+    assert _matches(METADATA, {})
+    assert _matches({}, {})
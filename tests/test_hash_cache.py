@@ -0,0 +1,94 @@
+"""Tests for the ingestion chunk-hash cache."""
+
+from langchain_core.documents import Document
+
+from knoroute.ingestion._hash_cache import ChunkCache, chunk_hash
+
+
+def _doc(text, **metadata):
+    return Document(page_content=text, metadata=metadata)
+
+
+def test_chunk_hash_covers_content_and_metadata():
+    assert chunk_hash(_doc("a", source="x")) == chunk_hash(_doc("a", source="x"))
+    assert chunk_hash(_doc("a", source="x")) != chunk_hash(_doc("b", source="x"))
+    assert chunk_hash(_doc("a", source="x")) != chunk_hash(_doc("a", source="y"))
+
+
+def test_chunk_hash_ignores_volatile_fields():
+    assert chunk_hash(_doc("a", created_at="2024-01-01")) == chunk_hash(_doc("a", created_at="2025-06-30"))
+    assert chunk_hash(_doc("a", content_hash="old")) == chunk_hash(_doc("a"))
+
+
+def test_filter_new_skips_marked_chunks(tmp_path):
+    cache = ChunkCache(str(tmp_path / "chunks.sqlite"))
+    docs = [_doc("one"), _doc("two")]
+
+    first = list(cache.filter_new(docs, "store"))
+    assert [doc.page_content for doc in first] == ["one", "two"]
+    assert all("content_hash" in doc.metadata for doc in first)
+
+    with cache.marking(lambda documents: ["id"] * len(documents), "store") as write:
+        write(first[:1])
+
+    again = list(cache.filter_new([_doc("one"), _doc("two")], "store"))
+    assert [doc.page_content for doc in again] == ["two"]
+
+
+def test_filter_new_drops_repeats_within_a_run(tmp_path):
+    cache = ChunkCache(str(tmp_path / "chunks.sqlite"))
+    docs = [_doc("same"), _doc("same"), _doc("other")]
+
+    result = list(cache.filter_new(docs, "store", batch_size=2))
+
+    assert [doc.page_content for doc in result] == ["same", "other"]
+
+
+def test_namespaces_are_independent(tmp_path):
+    cache = ChunkCache(str(tmp_path / "chunks.sqlite"))
+    marked = list(cache.filter_new([_doc("x")], "a"))
+    cache.mark([doc.metadata["content_hash"] for doc in marked], "a")
+
+    assert list(cache.filter_new([_doc("x")], "a")) == []
+    assert len(list(cache.filter_new([_doc("x")], "b"))) == 1
+
+
+def test_clear_namespace(tmp_path):
+    cache = ChunkCache(str(tmp_path / "chunks.sqlite"))
+    h = chunk_hash(_doc("x"))
+    cache.mark([h], "a")
+    cache.mark([h], "b")
+
+    cache.clear("a")
+
+    assert cache.seen([h], "a") == set()
+    assert cache.seen([h], "b") == {h}
+
+
+def test_marking_skips_documents_without_hash(tmp_path):
+    cache = ChunkCache(str(tmp_path / "chunks.sqlite"))
+    with cache.marking(lambda documents: [str(i) for i, _ in enumerate(documents)], "s") as write:
+        ids = write([_doc("no hash")])
+
+    assert ids == ["0"]
+    assert cache.seen([chunk_hash(_doc("no hash"))], "s") == set()
+
+
+def test_marking_with_save_records_only_after_saving(tmp_path):
+    cache = ChunkCache(str(tmp_path / "chunks.sqlite"))
+    docs = list(cache.filter_new([_doc("one"), _doc("two")], "s"))
+    hashes = [doc.metadata["content_hash"] for doc in docs]
+    saved = []
+
+    def save():
+        # Nothing is recorded before the store is flushed
+        assert cache.seen(hashes, "s") == set()
+        saved.append(True)
+
+    with cache.marking(lambda documents: ["id"] * len(documents), "s", save) as write:
+        write(docs[:1])
+        write(docs[1:])
+        assert cache.seen(hashes, "s") == set()
+
+    assert saved == [True]
+    assert cache.seen(hashes, "s") == set(hashes)
@@ -0,0 +1,20 @@
+"""Check that the LangChain modules knoroute depends on import correctly."""
+
+import importlib
+
+import pytest
+
+
+MODULES = [
+    "langchain_text_splitters",
+    "langchain_core.documents",
+    "langchain.retrievers.contextual_compression",
+    "langchain.retrievers.document_compressors",
+    "langchain_core.prompts",
+    "langchain_core.output_parsers",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_import(module):
+    importlib.import_module(module)
@@ -0,0 +1,83 @@
+"""Tests for the similarity search result cache."""
+
+from langchain_core.documents import Document
+
+from knoroute.vectorstores._search_cache import SearchCache
+
+
+def _results(text):
+    return [Document(page_content=text, metadata={"source_db": "docs"})]
+
+
+def test_repeated_query_is_served_from_cache():
+    cache = SearchCache(("test", "repeat"))
+    calls = []
+
+    def search():
+        calls.append(1)
+        return _results("a")
+
+    first = cache.get_or_search("q", 5, None, search)
+    second = cache.get_or_search("q", 5, None, search)
+
+    assert len(calls) == 1
+    assert [doc.page_content for doc in second] == ["a"]
+    # Callers get copies
+    first[0].metadata["x"] = 1
+    assert "x" not in cache.get_or_search("q", 5, None, search)[0].metadata
+
+
+def test_write_through_another_instance_invalidates():
+    reader = SearchCache(("test", "shared"))
+    writer = SearchCache(("test", "shared"))
+    other = SearchCache(("test", "unrelated"))
+    calls = []
+
+    def search():
+        calls.append(1)
+        return _results(str(len(calls)))
+
+    reader.get_or_search("q", 5, None, search)
+    other.clear()
+    reader.get_or_search("q", 5, None, search)
+    assert len(calls) == 1
+
+    writer.clear()
+    result = reader.get_or_search("q", 5, None, search)
+    assert len(calls) == 2
+    assert result[0].page_content == "2"
+
+
+def test_vector_searches_only_query_misses():
+    cache = SearchCache(("test", "vectors"))
+    searched = []
+
+    def search(vectors):
+        searched.append(len(vectors))
+        return [_results(str(vector[0])) for vector in vectors]
+
+    cache.get_or_search_vectors([[1.0, 0.0]], 3, search)
+    results = cache.get_or_search_vectors([[1.0, 0.0], [2.0, 0.0]], 3, search)
+
+    assert searched == [1, 1]
+    assert [docs[0].page_content for docs in results] == ["1.0", "2.0"]
+
+    # k is part of the key
+    cache.get_or_search_vectors([[1.0, 0.0]], 4, search)
+    assert searched == [1, 1, 1]
+
+
+def test_search_racing_a_write_is_not_cached():
+    cache = SearchCache(("test", "race"))
+    calls = []
+
+    def search():
+        calls.append(1)
+        if len(calls) == 1:
+            cache.clear()
+        return _results("a")
+
+    cache.get_or_search("q", 5, None, search)
+    cache.get_or_search("q", 5, None, search)
+
+    assert len(calls) == 2
@@ -0,0 +1,143 @@
+"""Parity of the batched ticket parsers with the original per-ticket loops."""
+
+import csv
+from datetime import datetime
+
+import pytest
+
+from knoroute.ingestion.tickets_ingest import TicketsIngestionPipeline
+
+
+# Reference implementations: the per-ticket parsers the batched ones replaced
+
+def _reference_generic(tickets):
+    documents = []
+    for ticket in tickets:
+        content_parts = []
+        if 'title' in ticket:
+            content_parts.append(f"Title: {ticket['title']}")
+        if 'description' in ticket:
+            content_parts.append(f"\nDescription: {ticket['description']}")
+        if 'comments' in ticket:
+            content_parts.append("\nComments:")
+            comments = ticket['comments']
+            if isinstance(comments, list):
+                for comment in comments:
+                    content_parts.append(f"- {comment}")
+            else:
+                content_parts.append(f"- {comments}")
+        documents.append(("\n".join(content_parts), {
+            "ticket_id": str(ticket.get('id', ticket.get('ticket_id', ''))),
+            "status": ticket.get('status', 'open'),
+            "severity": ticket.get('severity', ticket.get('priority', 'medium')).lower(),
+            "created_at": ticket.get('created_at', datetime.now().isoformat()),
+        }))
+    return documents
+
+
+def _reference_jira(issues):
+    documents = []
+    for issue in issues:
+        fields = issue.get('fields', issue)
+        content_parts = [
+            f"Title: {fields.get('summary', '')}",
+            f"\nDescription: {fields.get('description', '')}",
+        ]
+        if 'comment' in fields and 'comments' in fields['comment']:
+            content_parts.append("\nComments:")
+            for comment in fields['comment']['comments']:
+                content_parts.append(f"- {comment.get('body', '')}")
+        documents.append(("\n".join(content_parts), {
+            "ticket_id": issue.get('key', issue.get('id', '')),
+            "status": fields.get('status', {}).get('name', 'open'),
+            "severity": fields.get('priority', {}).get('name', 'medium').lower(),
+            "created_at": fields.get('created', datetime.now().isoformat()),
+        }))
+    return documents
+
+
+def _pairs(documents):
+    return [(doc.page_content, doc.metadata) for doc in documents]
+
+
+@pytest.fixture
+def pipeline():
+    # Parsing touches neither the store nor the chunk cache
+    return TicketsIngestionPipeline(vector_store=object(), chunk_cache=object())
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.mark.parametrize("header, rows", [
+    (
+        ["id", "title", "description", "status", "severity", "created_at", "comments"],
+        [
+            ["T-1", "Login fails", "500 on /login", "open", "High", "2024-01-02", "seen twice"],
+            ["T-2", "Slow search", "p99 > 2s\nafter deploy", "closed", "LOW", "2024-02-03", ""],
+        ],
+    ),
+    (
+        ["ticket_id", "title", "priority", "created_at"],
+        [["42", "Crash on start", "Critical", "2024-03-04"]],
+    ),
+    (
+        ["description", "created_at"],
+        [["No title, default status and severity", "2024-04-05"]],
+    ),
+])
+def test_csv_documents_match_reference(pipeline, tmp_path, header, rows):
+    path = tmp_path / "tickets.csv"
+    _write_csv(path, header, rows)
+
+    expected = _reference_generic(pipeline.load_csv_file(str(path)))
+
+    assert _pairs(pipeline.iter_csv_documents(str(path), batch_size=1)) == expected
+    assert _pairs(pipeline.iter_csv_documents(str(path))) == expected
+    assert _pairs(pipeline.parse_generic_tickets(pipeline.load_csv_file(str(path)))) == expected
+
+
+def test_generic_list_comments_match_reference(pipeline):
+    tickets = [
+        {"id": 7, "title": "A", "comments": ["one", "two"], "created_at": "2024-01-01"},
+        {"ticket_id": "B-1", "description": "only a description", "created_at": "2024-01-01"},
+    ]
+
+    assert _pairs(pipeline.parse_generic_tickets(tickets)) == _reference_generic(tickets)
+
+
+def test_jira_issues_match_reference(pipeline):
+    issues = [
+        {
+            "key": "PROJ-1",
+            "fields": {
+                "summary": "Token refresh loop",
+                "description": "Clients refresh forever",
+                "status": {"name": "In Progress"},
+                "priority": {"name": "High"},
+                "created": "2024-05-06T10:00:00",
+                "comment": {"comments": [{"body": "repro'd"}, {"body": "fixed in 1.2"}]},
+            },
+        },
+        {
+            "id": "10002",
+            "fields": {
+                "summary": "Missing priority and status",
+                "created": "2024-05-07T10:00:00",
+            },
+        },
+        {
+            # Flat issue without a "fields" wrapper
+            "key": "PROJ-3",
+            "summary": "Flat export",
+            "description": "fields at the top level",
+            "priority": {"name": "Low"},
+            "created": "2024-05-08T10:00:00",
+        },
+    ]
+
+    assert _pairs(pipeline.parse_jira_issues(issues)) == _reference_jira(issues)